@@ -12,7 +12,8 @@ This suite checks the requested conflict classes:
 Usage:
   python3 scripts/piece_conflict_suite.py \
     --manifest scripts/testcases/piece_conflicts/manifest.json \
-    --out-dir out/piece_conflict_suite
+    --out-dir out/piece_conflict_suite \
+    --jobs 4
 """
 
 from __future__ import annotations
@@ -21,16 +22,37 @@ import argparse
 import csv
 import json
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from scripts.piece_level_verifier import load_input, parse_dt, run_piece_level_schedule
+from scripts.piece_level_verifier import (
+    BreakdownIndex,
+    HolidayIndex,
+    fmt_minute,
+    parse_dt,
+    parse_input,
+    row_minute,
+    run_piece_level_schedule,
+    to_minute,
+)
 
 
 CONFLICT_CODES: Tuple[str, ...] = (
@@ -49,45 +71,32 @@ class Conflict:
     message: str
 
 
-def parse_holiday_dates(raw_holidays: Sequence[str]) -> Set[date]:
-    out: Set[date] = set()
+def parse_holiday_dates(raw_holidays: Sequence[str]) -> HolidayIndex:
+    out: List[datetime] = []
     for item in raw_holidays:
         if len(item) == 10:
-            out.add(datetime.strptime(item, "%Y-%m-%d").date())
+            out.append(datetime.strptime(item, "%Y-%m-%d"))
         else:
-            out.add(parse_dt(item).date())
-    return out
+            out.append(parse_dt(item))
+    return HolidayIndex.from_datetimes(out)
 
 
-def interval_overlap(
-    left: Tuple[datetime, datetime], right: Tuple[datetime, datetime]
-) -> bool:
+def interval_overlap(left: Tuple[int, int], right: Tuple[int, int]) -> bool:
     return left[0] < right[1] and right[0] < left[1]
 
 
-def interval_hits_holiday(
-    start: datetime, end: datetime, holiday_dates: Set[date]
-) -> bool:
-    day = start.date()
-    end_day = end.date()
-    while day <= end_day:
-        if day in holiday_dates:
-            day_start = datetime.combine(day, time.min)
-            day_end = day_start + timedelta(days=1)
-            if start < day_end and end > day_start:
-                return True
-        day += timedelta(days=1)
-    return False
+def interval_hits_holiday(start: int, end: int, holidays: HolidayIndex) -> bool:
+    return holidays.overlaps(start, end)
 
 
-def check_machine_conflict(op_rows: Sequence[Dict[str, Any]]) -> List[Conflict]:
-    grouped: Dict[str, List[Tuple[datetime, datetime, str]]] = {}
+def check_machine_conflict(op_rows: Sequence[Mapping[str, Any]]) -> List[Conflict]:
+    grouped: Dict[str, List[Tuple[int, int, str]]] = {}
     for row in op_rows:
         machine = str(row.get("Machine", "")).strip()
         if not machine:
             continue
-        start = parse_dt(str(row["SetupStart"]))
-        end = parse_dt(str(row["RunEnd"]))
+        start = row_minute(row, "SetupStart")
+        end = row_minute(row, "RunEnd")
         entity = (
             f"{row['PartNumber']}/{row['Batch_ID']}/OP{row['OperationSeq']}"
         )
@@ -106,7 +115,7 @@ def check_machine_conflict(op_rows: Sequence[Dict[str, Any]]) -> List[Conflict]:
                         entity_ref=f"{machine}",
                         message=(
                             f"Overlap between {prev[2]} and {curr[2]} at "
-                            f"{curr[0].strftime('%Y-%m-%d %H:%M')}"
+                            f"{fmt_minute(curr[0])}"
                         ),
                     )
                 )
@@ -114,10 +123,10 @@ def check_machine_conflict(op_rows: Sequence[Dict[str, Any]]) -> List[Conflict]:
 
 
 def check_person_conflict(
-    op_rows: Sequence[Dict[str, Any]], mode: str
+    op_rows: Sequence[Mapping[str, Any]], mode: str
 ) -> List[Conflict]:
-    grouped_setup: Dict[str, List[Tuple[datetime, datetime, str]]] = {}
-    grouped_run: Dict[str, List[Tuple[datetime, datetime, str]]] = {}
+    grouped_setup: Dict[str, List[Tuple[int, int, str]]] = {}
+    grouped_run: Dict[str, List[Tuple[int, int, str]]] = {}
 
     for row in op_rows:
         operator = str(row.get("Operator", "")).strip()
@@ -127,12 +136,12 @@ def check_person_conflict(
             f"{row['PartNumber']}/{row['Batch_ID']}/OP{row['OperationSeq']}"
         )
 
-        setup_start = parse_dt(str(row["SetupStart"]))
-        setup_end = parse_dt(str(row["SetupEnd"]))
+        setup_start = row_minute(row, "SetupStart")
+        setup_end = row_minute(row, "SetupEnd")
         grouped_setup.setdefault(operator, []).append((setup_start, setup_end, entity))
 
-        run_start = parse_dt(str(row["RunStart"]))
-        run_end = parse_dt(str(row["RunEnd"]))
+        run_start = row_minute(row, "RunStart")
+        run_end = row_minute(row, "RunEnd")
         grouped_run.setdefault(operator, []).append((run_start, run_end, entity))
 
     conflicts: List[Conflict] = []
@@ -149,7 +158,7 @@ def check_person_conflict(
                         entity_ref=operator,
                         message=(
                             "Setup overlap between "
-                            f"{prev[2]} and {curr[2]} at {curr[0].strftime('%Y-%m-%d %H:%M')}"
+                            f"{prev[2]} and {curr[2]} at {fmt_minute(curr[0])}"
                         ),
                     )
                 )
@@ -167,7 +176,7 @@ def check_person_conflict(
                             entity_ref=operator,
                             message=(
                                 "Run overlap between "
-                                f"{prev[2]} and {curr[2]} at {curr[0].strftime('%Y-%m-%d %H:%M')}"
+                                f"{prev[2]} and {curr[2]} at {fmt_minute(curr[0])}"
                             ),
                         )
                     )
@@ -175,7 +184,7 @@ def check_person_conflict(
     return conflicts
 
 
-def check_pn_conflict(op_rows: Sequence[Dict[str, Any]]) -> List[Conflict]:
+def check_pn_conflict(op_rows: Sequence[Mapping[str, Any]]) -> List[Conflict]:
     grouped: Dict[Tuple[str, str], List[int]] = {}
     for row in op_rows:
         key = (str(row["PartNumber"]), str(row["Batch_ID"]))
@@ -215,39 +224,39 @@ def check_pn_conflict(op_rows: Sequence[Dict[str, Any]]) -> List[Conflict]:
 
 
 def check_holiday_conflict(
-    op_rows: Sequence[Dict[str, Any]], holiday_dates: Set[date]
+    op_rows: Sequence[Mapping[str, Any]], holidays: HolidayIndex
 ) -> List[Conflict]:
-    if not holiday_dates:
+    if not holidays:
         return []
 
     conflicts: List[Conflict] = []
     for row in op_rows:
         entity = f"{row['PartNumber']}/{row['Batch_ID']}/OP{row['OperationSeq']}"
 
-        setup_start = parse_dt(str(row["SetupStart"]))
-        setup_end = parse_dt(str(row["SetupEnd"]))
-        if interval_hits_holiday(setup_start, setup_end, holiday_dates):
+        setup_start = row_minute(row, "SetupStart")
+        setup_end = row_minute(row, "SetupEnd")
+        if interval_hits_holiday(setup_start, setup_end, holidays):
             conflicts.append(
                 Conflict(
                     code="HOLIDAY_CONFLICT",
                     entity_ref=entity,
                     message=(
-                        f"Setup interval {setup_start.strftime('%Y-%m-%d %H:%M')} -> "
-                        f"{setup_end.strftime('%Y-%m-%d %H:%M')} intersects holiday"
+                        f"Setup interval {fmt_minute(setup_start)} -> "
+                        f"{fmt_minute(setup_end)} intersects holiday"
                     ),
                 )
             )
 
-        run_start = parse_dt(str(row["RunStart"]))
-        run_end = parse_dt(str(row["RunEnd"]))
-        if interval_hits_holiday(run_start, run_end, holiday_dates):
+        run_start = row_minute(row, "RunStart")
+        run_end = row_minute(row, "RunEnd")
+        if interval_hits_holiday(run_start, run_end, holidays):
             conflicts.append(
                 Conflict(
                     code="HOLIDAY_CONFLICT",
                     entity_ref=entity,
                     message=(
-                        f"Run interval {run_start.strftime('%Y-%m-%d %H:%M')} -> "
-                        f"{run_end.strftime('%Y-%m-%d %H:%M')} intersects holiday"
+                        f"Run interval {fmt_minute(run_start)} -> "
+                        f"{fmt_minute(run_end)} intersects holiday"
                     ),
                 )
             )
@@ -256,78 +265,84 @@ def check_holiday_conflict(
 
 
 def check_machine_availability_conflict(
-    op_rows: Sequence[Dict[str, Any]], raw_input: Dict[str, Any]
+    op_rows: Sequence[Mapping[str, Any]], raw_input: Dict[str, Any]
 ) -> List[Conflict]:
     rules = raw_input.get("machine_availability", [])
     if not rules:
         return []
 
-    by_machine: Dict[str, List[Dict[str, Any]]] = {}
-    for rule in rules:
+    # Non-RANGE rules are checked one by one; RANGE rules go into an unmerged
+    # BreakdownIndex, so each row only visits the ranges it may overlap and
+    # every conflict cites an original rule. Conflicts keep the input order.
+    by_machine: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+    ranges: List[Tuple[str, int, int]] = []
+    range_orders: List[int] = []
+    for order, rule in enumerate(rules):
         machine = str(rule.get("machine", "")).strip()
-        if machine:
-            by_machine.setdefault(machine, []).append(rule)
+        if not machine:
+            continue
+        if str(rule.get("type", "")).upper().strip() == "RANGE":
+            start_raw = rule.get("start")
+            end_raw = rule.get("end")
+            if start_raw and end_raw:
+                b_start = to_minute(parse_dt(str(start_raw)))
+                b_end = to_minute(parse_dt(str(end_raw)))
+                ranges.append((machine, b_start, b_end))
+                range_orders.append(order)
+        else:
+            by_machine.setdefault(machine, []).append((order, rule))
+    range_index = BreakdownIndex(ranges, merge=False)
 
     conflicts: List[Conflict] = []
     for row in op_rows:
         machine = str(row.get("Machine", "")).strip()
-        if machine not in by_machine:
-            continue
-
         entity = f"{row['PartNumber']}/{row['Batch_ID']}/OP{row['OperationSeq']}"
-        op_start = parse_dt(str(row["SetupStart"]))
-        op_end = parse_dt(str(row["RunEnd"]))
+        op_start = row_minute(row, "SetupStart")
+        op_end = row_minute(row, "RunEnd")
+        details: List[Tuple[int, str]] = []
 
-        for rule in by_machine[machine]:
+        for order, rule in by_machine.get(machine, []):
             rtype = str(rule.get("type", "")).upper().strip()
-            blocked = False
-            detail = ""
-
             if rtype == "PERMANENT":
-                blocked = True
-                detail = "PERMANENT"
+                details.append((order, "PERMANENT"))
             elif rtype == "AVAILABLE_FROM":
                 from_raw = rule.get("from") or rule.get("start")
                 if from_raw:
-                    available_from = parse_dt(str(from_raw))
-                    blocked = op_start < available_from
-                    detail = f"AVAILABLE_FROM {available_from.strftime('%Y-%m-%d %H:%M')}"
-            elif rtype == "RANGE":
-                start_raw = rule.get("start")
-                end_raw = rule.get("end")
-                if start_raw and end_raw:
-                    b_start = parse_dt(str(start_raw))
-                    b_end = parse_dt(str(end_raw))
-                    blocked = interval_overlap((op_start, op_end), (b_start, b_end))
-                    detail = (
-                        f"RANGE {b_start.strftime('%Y-%m-%d %H:%M')} -> "
-                        f"{b_end.strftime('%Y-%m-%d %H:%M')}"
-                    )
+                    available_from = to_minute(parse_dt(str(from_raw)))
+                    if op_start < available_from:
+                        details.append(
+                            (order, f"AVAILABLE_FROM {fmt_minute(available_from)}")
+                        )
 
-            if blocked:
-                conflicts.append(
-                    Conflict(
-                        code="MACHINE_AVAILABILITY_CONFLICT",
-                        entity_ref=entity,
-                        message=f"{machine} violates availability rule {detail}",
-                    )
+        for position in range_index.overlapping(machine, op_start, op_end):
+            _, b_start, b_end = ranges[position]
+            detail = f"RANGE {fmt_minute(b_start)} -> {fmt_minute(b_end)}"
+            details.append((range_orders[position], detail))
+
+        for _, detail in sorted(details):
+            conflicts.append(
+                Conflict(
+                    code="MACHINE_AVAILABILITY_CONFLICT",
+                    entity_ref=entity,
+                    message=f"{machine} violates availability rule {detail}",
                 )
+            )
 
     return conflicts
 
 
 def collect_conflicts(
-    op_rows: Sequence[Dict[str, Any]],
+    op_rows: Sequence[Mapping[str, Any]],
     raw_input: Dict[str, Any],
     person_mode: str,
 ) -> List[Conflict]:
-    holiday_dates = parse_holiday_dates(raw_input.get("holidays", []))
+    holidays = parse_holiday_dates(raw_input.get("holidays", []))
 
     conflicts = []
     conflicts.extend(check_machine_conflict(op_rows))
     conflicts.extend(check_person_conflict(op_rows, mode=person_mode))
     conflicts.extend(check_pn_conflict(op_rows))
-    conflicts.extend(check_holiday_conflict(op_rows, holiday_dates=holiday_dates))
+    conflicts.extend(check_holiday_conflict(op_rows, holidays=holidays))
     conflicts.extend(check_machine_availability_conflict(op_rows, raw_input=raw_input))
 
     # Deduplicate exact duplicates while preserving order.
@@ -341,7 +356,7 @@ def collect_conflicts(
     return deduped
 
 
-def write_csv(path: Path, rows: Sequence[Dict[str, Any]]) -> None:
+def write_csv(path: Path, rows: Sequence[Mapping[str, Any]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     if not rows:
         path.write_text("", encoding="utf-8")
@@ -361,17 +376,20 @@ def evaluate_case(
 ) -> Dict[str, Any]:
     input_rel = case["input"]
     input_path = repo_root / input_rel
+    t0 = time.perf_counter()
     raw_input = json.loads(input_path.read_text(encoding="utf-8"))
-
-    batches, settings = load_input(input_path, demo=None, lane_mode="machine")
+    batches, settings = parse_input(raw_input, lane_mode="machine")
     results = run_piece_level_schedule(batches, settings)
+    schedule_sec = time.perf_counter() - t0
 
+    t0 = time.perf_counter()
     person_mode = str(case.get("person_conflict_mode", "setup_only"))
     conflicts = collect_conflicts(
         op_rows=results["operation_rows"],
         raw_input=raw_input,
         person_mode=person_mode,
     )
+    conflict_check_sec = time.perf_counter() - t0
 
     found_codes = sorted({c.code for c in conflicts})
     expected_present = list(case.get("expected_present", []))
@@ -405,6 +423,10 @@ def evaluate_case(
         "status": "PASS" if ok else "FAIL",
         "validation_from_scheduler": results.get("validation", {}),
         "conflict_count": len(conflicts),
+        "timings": {
+            "schedule_sec": round(schedule_sec, 4),
+            "conflict_check_sec": round(conflict_check_sec, 4),
+        },
     }
 
     (case_out_dir / "report.json").write_text(
@@ -422,21 +444,29 @@ def load_manifest(path: Path) -> Dict[str, Any]:
     return manifest
 
 
-def run_suite(manifest_path: Path, out_dir: Path) -> Dict[str, Any]:
+def run_suite(manifest_path: Path, out_dir: Path, jobs: int = 1) -> Dict[str, Any]:
     repo_root = Path(__file__).resolve().parent.parent
     manifest = load_manifest(manifest_path)
+    t0 = time.perf_counter()
 
     cases = manifest.get("cases", [])
-    reports = []
-
-    for case in cases:
-        case_id = case["id"]
-        case_out_dir = out_dir / case_id
+    case_dirs = [out_dir / case["id"] for case in cases]
+    for case_out_dir in case_dirs:
         case_out_dir.mkdir(parents=True, exist_ok=True)
-        report = evaluate_case(repo_root=repo_root, case=case, case_out_dir=case_out_dir)
-        reports.append(report)
+
+    # pool.map yields in manifest order, so reports stay deterministic.
+    jobs = max(1, min(jobs, len(cases)))
+    call_args = ([repo_root] * len(cases), cases, case_dirs)
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            reports = list(pool.map(evaluate_case, *call_args))
+    else:
+        reports = list(map(evaluate_case, *call_args))
+
+    for report in reports:
+        timings = report["timings"]
         print(
-            f"[{report['status']}] {case_id} found={','.join(report['found_codes']) or 'NONE'}"
+            f"[{report['status']}] {report['id']} found={','.join(report['found_codes']) or 'NONE'} schedule={timings['schedule_sec']:.2f}s check={timings['conflict_check_sec']:.2f}s"
         )
 
     passed = sum(1 for r in reports if r["status"] == "PASS")
@@ -449,6 +479,8 @@ def run_suite(manifest_path: Path, out_dir: Path) -> Dict[str, Any]:
         "passed": passed,
         "failed": failed,
         "all_passed": failed == 0,
+        "jobs": jobs,
+        "elapsed_sec": round(time.perf_counter() - t0, 4),
         "reports": reports,
     }
 
@@ -474,9 +506,15 @@ def main() -> None:
         default=Path("out/piece_conflict_suite"),
         help="Output folder for suite reports",
     )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for evaluating cases in parallel",
+    )
     args = parser.parse_args()
 
-    suite = run_suite(args.manifest, args.out_dir)
+    suite = run_suite(args.manifest, args.out_dir, jobs=args.jobs)
     print(
         f"[SUITE] total={suite['total']} passed={suite['passed']} failed={suite['failed']}"
     )
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark and determinism checks for the piece-level scheduler.
+
+Drives ``run_piece_level_schedule`` in-process over a grid of synthetic plans
+(batch_qty, machines, operators, holidays/breakdowns off or on) and maps each
+case onto one of CHK-451..480 ("Performance + Determinism"). A case passes
+when its schedule validates, every repeat yields the same schedule digest
+and, if a baseline is stored, its median does not regress past
+``--regression-pct``. Without a baseline no regression check runs, and the
+results say so in ``regression_check``. Each case also records the
+scheduler's hot-path counters, which track algorithmic work without the
+timer noise.
+
+Usage:
+  python3 scripts/piece_level_bench.py --grid quick --out-dir out/piece_level_bench
+  python3 scripts/piece_level_bench.py --grid full --repeats 7 --save-baseline
+  python3 scripts/piece_level_bench.py --calendar on --baseline out/bench_baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.piece_level_verifier import (
+    ENGINE_VERSION,
+    OPERATION_FIELDS,
+    TIME_FMT,
+    parse_input,
+    run_piece_level_schedule,
+)
+
+
+PLAN_START = datetime(2026, 3, 2, 6, 0)
+CALENDAR_WEEKS = 60
+QUICK_MAX_QTY = 10000
+
+# (batch_qty, machines, operators) shapes: one sweep per axis. Shape i maps to
+# CHK-451+i with holidays/breakdowns off and CHK-466+i with them on.
+SHAPES: Tuple[Tuple[int, int, int], ...] = (
+    (10, 2, 2),
+    (100, 2, 2),
+    (1000, 2, 2),
+    (10000, 2, 2),
+    (100000, 2, 2),
+    (100, 1, 4),
+    (100, 5, 4),
+    (100, 10, 4),
+    (100, 25, 4),
+    (100, 50, 4),
+    (100, 5, 1),
+    (100, 5, 5),
+    (100, 5, 10),
+    (100, 5, 50),
+    (100, 5, 100),
+)
+FIRST_CHECK_ID = 451
+CALENDAR_CHECK_OFFSET = len(SHAPES)
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    check_id: int
+    batch_qty: int
+    machines: int
+    operators: int
+    calendar: bool
+    capped: bool = False
+
+    @property
+    def name(self) -> str:
+        cal = "cal" if self.calendar else "plain"
+        name = f"q{self.batch_qty}-m{self.machines}-o{self.operators}-{cal}"
+        return f"{name}-capped" if self.capped else name
+
+
+def build_cases(grid: str, calendar: str) -> List[BenchCase]:
+    """Expand ``SHAPES`` for the selected grid and calendar variants.
+
+    The quick grid caps batch_qty at ``QUICK_MAX_QTY`` so it fits a per-commit
+    gate. Capped cases carry a ``-capped`` suffix, so they never share a name
+    (and so a baseline) with the uncapped shape of the same size.
+    """
+    cases = []
+    for on in (False, True):
+        if calendar != "both" and on != (calendar == "on"):
+            continue
+        for index, (qty, machines, operators) in enumerate(SHAPES):
+            capped = grid == "quick" and qty > QUICK_MAX_QTY
+            if capped:
+                qty = QUICK_MAX_QTY
+            check_id = FIRST_CHECK_ID + index + (CALENDAR_CHECK_OFFSET if on else 0)
+            cases.append(BenchCase(check_id, qty, machines, operators, on, capped))
+    return cases
+
+
+def synthetic_input(case: BenchCase) -> Dict[str, Any]:
+    """Input JSON for a case: one batch per two machines, three operations each.
+
+    Operation k of batch b may run on two neighbouring machines, so machine
+    choice and operator search both scale with the grid axes. Operators
+    alternate between a day and an evening shift.
+    """
+    machines = [f"VMC {i + 1}" for i in range(case.machines)]
+    operators = [f"OP{i + 1}" for i in range(case.operators)]
+    batch_count = max(1, case.machines // 2)
+    batches = []
+    for b in range(batch_count):
+        operations = []
+        for k in range(3):
+            first = (2 * b + k) % case.machines
+            second = (first + 1) % case.machines
+            eligible = sorted({machines[first], machines[second]})
+            operations.append(
+                {
+                    "operation_seq": k + 1,
+                    "operation_name": f"Op{k + 1}",
+                    "setup_time_min": 30,
+                    "cycle_time_min": k + 1,
+                    "eligible_machines": eligible,
+                }
+            )
+        batches.append(
+            {
+                "part_number": f"PN{b + 1:03d}",
+                "batch_id": f"B{b + 1:03d}",
+                "batch_qty": case.batch_qty,
+                "start_datetime": (PLAN_START + timedelta(hours=b)).strftime(TIME_FMT),
+                "operations": operations,
+            }
+        )
+
+    holidays: List[str] = []
+    breakdowns: List[Dict[str, str]] = []
+    if case.calendar:
+        for week in range(CALENDAR_WEEKS):
+            monday = PLAN_START + timedelta(weeks=week)
+            holidays.append((monday + timedelta(days=6)).strftime("%Y-%m-%d"))
+            for i, machine in enumerate(machines):
+                start = monday + timedelta(days=i % 5, hours=4)
+                breakdowns.append(
+                    {
+                        "machine": machine,
+                        "start": start.strftime(TIME_FMT),
+                        "end": (start + timedelta(hours=2)).strftime(TIME_FMT),
+                    }
+                )
+
+    return {
+        "setup_window": "06:00-22:00",
+        "production_window": "06:00-22:00",
+        "operators_by_shift": {
+            "day": operators[0::2],
+            "evening": operators[1::2],
+        },
+        "shifts": {
+            op: "06:00-14:00" if i % 2 == 0 else "14:00-22:00"
+            for i, op in enumerate(operators)
+        },
+        "holidays": holidays,
+        "breakdowns": breakdowns,
+        "machine_mode": "optimize",
+        "batches": batches,
+    }
+
+
+def schedule_digest(results: Dict[str, Any]) -> str:
+    """Hash of the operation rows, piece timeline columns and validation."""
+    digest = hashlib.sha256()
+    for record in results["operation_rows"]:
+        digest.update(repr([record[field] for field in OPERATION_FIELDS]).encode())
+    pieces = results["piece_rows"]
+    for column in (pieces.machine_ids, pieces.starts, pieces.ends, pieces.run_starts):
+        digest.update(column.tobytes())
+    digest.update(repr(results["validation"]["errors"]).encode())
+    return digest.hexdigest()
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def median(samples: Sequence[float]) -> float:
+    ordered = sorted(samples)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2
+
+
+def measure_case(case: BenchCase, repeats: int, warmup: int) -> Dict[str, Any]:
+    raw = synthetic_input(case)
+    samples_ms: List[float] = []
+    digests = set()
+    pieces = 0
+    valid = True
+    counters: Dict[str, int] = {}
+    for i in range(warmup + repeats):
+        batches, settings = parse_input(raw, lane_mode="machine")
+        gc.collect()
+        t0 = time.perf_counter()
+        results = run_piece_level_schedule(batches, settings)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        digests.add(schedule_digest(results))
+        pieces = len(results["piece_rows"])
+        valid = valid and results["validation"]["valid"]
+        counters = results["validation"]["stats"]["counters"]
+        if i >= warmup:
+            samples_ms.append(round(elapsed_ms, 3))
+        del results
+    return {
+        "check_id": f"CHK-{case.check_id:03d}",
+        "case": case.name,
+        "batch_qty": case.batch_qty,
+        "machines": case.machines,
+        "operators": case.operators,
+        "calendar": case.calendar,
+        "pieces": pieces,
+        "samples_ms": samples_ms,
+        "median_ms": round(median(samples_ms), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "deterministic": len(digests) == 1,
+        "digest": sorted(digests)[0],
+        "valid": valid,
+        "counters": counters,
+    }
+
+
+def judge(
+    entry: Dict[str, Any],
+    baseline: Dict[str, Dict[str, Any]],
+    regression_pct: float,
+    min_delta_ms: float,
+) -> None:
+    """Set ``status``/``notes`` on a measured case in place.
+
+    A regression needs both the relative and the absolute slowdown, so tiny
+    cases do not fail on timer noise. A changed digest against the baseline
+    is reported in ``notes`` only: schedule changes may be intentional.
+    """
+    notes: List[str] = []
+    status = "PASS"
+    if entry["valid"] is not True:
+        status = "FAIL"
+        notes.append("schedule failed validation")
+    if not entry["deterministic"]:
+        status = "FAIL"
+        notes.append("schedule digest differs between repeats")
+    base = baseline.get(entry["case"])
+    entry["regression_checked"] = base is not None
+    if base is not None:
+        base_ms = float(base["median_ms"])
+        delta_ms = entry["median_ms"] - base_ms
+        entry["baseline_median_ms"] = base_ms
+        entry["regression_pct"] = round(100 * delta_ms / base_ms, 2) if base_ms else 0.0
+        if delta_ms > min_delta_ms and entry["regression_pct"] > regression_pct:
+            status = "FAIL"
+            notes.append(
+                f"median {entry['median_ms']:.1f}ms regressed {entry['regression_pct']:.1f}% over baseline {base_ms:.1f}ms"
+            )
+        if base.get("digest") not in (None, entry["digest"]):
+            notes.append("schedule digest differs from baseline")
+    entry["status"] = status
+    entry["notes"] = "; ".join(notes)
+
+
+def load_baseline(path: Optional[Path]) -> Dict[str, Dict[str, Any]]:
+    if path is None or not path.exists():
+        return {}
+    record = json.loads(path.read_text(encoding="utf-8"))
+    return {entry["case"]: entry for entry in record.get("cases", [])}
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Piece-level scheduler benchmark")
+    parser.add_argument(
+        "--grid",
+        choices=["quick", "full"],
+        default="quick",
+        help=f"quick caps batch_qty at {QUICK_MAX_QTY}; full runs up to 100k",
+    )
+    parser.add_argument(
+        "--calendar",
+        choices=["off", "on", "both"],
+        default="both",
+        help="Holidays/breakdowns variant: off (CHK-451..465), on (CHK-466..480)",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case")
+    parser.add_argument(
+        "--out-dir",
+        type=Path,
+        default=Path("out/piece_level_bench"),
+        help="Folder for bench_results.json and the history",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        default=None,
+        help="JSON-lines history to append to (default: <out-dir>/bench_history.jsonl)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Results to compare against (default: <out-dir>/bench_baseline.json)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store this run as the baseline after checking it",
+    )
+    parser.add_argument(
+        "--regression-pct",
+        type=float,
+        default=25.0,
+        help="Fail a case whose median is this much slower than the baseline",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=5.0,
+        help="Ignore regressions smaller than this absolute slowdown",
+    )
+    args = parser.parse_args(argv)
+
+    out_dir = args.out_dir
+    history_path = args.history or out_dir / "bench_history.jsonl"
+    baseline_path = args.baseline or out_dir / "bench_baseline.json"
+    baseline = load_baseline(baseline_path)
+    if baseline:
+        regression_check = f"ran against {baseline_path}"
+    else:
+        regression_check = f"skipped: no baseline at {baseline_path}"
+        print(
+            f"[WARN] regression check skipped: no baseline at {baseline_path} (record one with --save-baseline)"
+        )
+
+    entries = []
+    for case in build_cases(args.grid, args.calendar):
+        entry = measure_case(case, max(1, args.repeats), max(0, args.warmup))
+        judge(entry, baseline, args.regression_pct, args.min_delta_ms)
+        entries.append(entry)
+        print(
+            f"[{entry['status']}] {entry['check_id']} {entry['case']} median={entry['median_ms']:.1f}ms p95={entry['p95_ms']:.1f}ms pieces={entry['pieces']}"
+            + (f" ({entry['notes']})" if entry["notes"] else "")
+        )
+
+    failed = sum(1 for entry in entries if entry["status"] != "PASS")
+    record = {
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "engine_version": ENGINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "grid": args.grid,
+        "repeats": args.repeats,
+        "warmup": args.warmup,
+        "regression_pct": args.regression_pct,
+        "baseline": str(baseline_path) if baseline else None,
+        "regression_check": regression_check,
+        "total": len(entries),
+        "passed": len(entries) - failed,
+        "failed": failed,
+        "checks": {entry["check_id"]: entry["status"] for entry in entries},
+        "cases": entries,
+    }
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "bench_results.json").write_text(
+        json.dumps(record, indent=2), encoding="utf-8"
+    )
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with history_path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    if args.save_baseline and not failed:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"[OK] baseline saved: {baseline_path}")
+
+    passed = len(entries) - failed
+    print(f"[BENCH] total={len(entries)} passed={passed} failed={failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Long-running piece-level scheduler with a localhost JSON API.
+
+Keeps interpreters, compiled calendars and recent results warm so small
+what-if requests avoid the per-process startup of piece_level_verifier.py.
+
+Usage:
+  python3 scripts/piece_level_server.py --port 8765 --workers 2 --out-root out/server
+
+  curl -s localhost:8765/health
+  curl -s -H 'Content-Type: application/json' \
+    --data @scripts/piece_level_input.example.json \
+    'localhost:8765/schedule?rows=pieces'
+  curl -s -H 'Content-Type: application/json' \
+    --data @scripts/piece_level_input.example.json \
+    'localhost:8765/schedule?out_dir=whatif'
+
+POST /schedule takes the same JSON document as ``--input`` and requires
+``Content-Type: application/json``, so browsers cannot send it cross-site
+without a CORS preflight (which the server never grants). Query parameters:
+  lane_mode     machine | operation (default machine)
+  machine_mode  respect_fixed | optimize (overrides the input)
+  validate      full | fast | off (overrides the input)
+  rows          comma list of extra row sets to return: pieces, events
+  out_dir       also write the usual CSV/HTML/JSON artifacts there; a path
+                relative to --out-root that must stay inside it
+  cache         0 to bypass the result caches for this request
+
+Malformed input gets a 400, a schedule that cannot be built a 422.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from scripts.piece_level_verifier import (
+    CACHE_DIR,
+    ENGINE_VERSION,
+    VALIDATE_MODES,
+    CalendarEngine,
+    ScheduleCache,
+    calendar_cache_key,
+    demo_input,
+    parse_input,
+    run_piece_level_schedule,
+    schedule_cache_key,
+    write_outputs,
+)
+
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+DEFAULT_OUT_ROOT = Path("out") / "server"
+# Raised by parse_input/CalendarEngine for malformed documents
+# (e.g. ``"shifts": ["A"]`` or ``"setup_window": 5``).
+INPUT_ERRORS = (ValueError, TypeError, AttributeError, KeyError)
+ENGINE_CACHE_ENTRIES = 16
+RESPONSE_CACHE_ENTRIES = 128
+ROW_SETS = ("pieces", "events")
+
+# Per worker process: each pool worker keeps its own warm engines and results.
+_ENGINES: "OrderedDict[str, CalendarEngine]" = OrderedDict()
+_RESPONSES: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+@dataclass
+class ScheduleRequest:
+    payload: bytes
+    lane_mode: str = "machine"
+    machine_mode: Optional[str] = None
+    validate: Optional[str] = None
+    rows: Tuple[str, ...] = ()
+    out_dir: Optional[str] = None
+    use_cache: bool = True
+    cache_dir: Optional[str] = None
+
+
+def _lru_get(cache: "OrderedDict[str, Any]", key: str) -> Any:
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: "OrderedDict[str, Any]", key: str, value: Any, cap: int) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > cap:
+        cache.popitem(last=False)
+
+
+def _encode(body: Dict[str, Any]) -> bytes:
+    return json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def _error_body(exc: Exception) -> bytes:
+    return _encode({"error": str(exc), "error_class": type(exc).__name__})
+
+
+def warm_worker() -> None:
+    """Pool initializer: import and exercise the scheduler once."""
+    run_piece_level_schedule(*demo_input("batch3", "machine"))
+
+
+def handle_schedule(request: ScheduleRequest) -> Tuple[int, bytes, str]:
+    """Schedule one request; returns (HTTP status, JSON body, cache state)."""
+    try:
+        raw = json.loads(request.payload)
+        batches, settings = parse_input(raw, request.lane_mode)
+        if request.machine_mode is not None:
+            settings.machine_mode = request.machine_mode
+        if request.validate is not None:
+            settings.validate_mode = request.validate
+        key = schedule_cache_key(batches, settings)
+    except INPUT_ERRORS as exc:
+        return 400, _error_body(exc), ""
+
+    memo_key = f"{key}:{','.join(request.rows)}"
+    body = _lru_get(_RESPONSES, memo_key) if request.use_cache else None
+    disk = None
+    if request.out_dir is not None:
+        out_dir = Path(request.out_dir)
+        if request.use_cache:
+            disk = ScheduleCache(Path(request.cache_dir or CACHE_DIR))
+            if not disk.restore(key, out_dir):
+                body = None
+        else:
+            body = None
+    if body is not None:
+        return 200, body, "hit"
+
+    try:
+        engine_key = calendar_cache_key(settings)
+        engine = _lru_get(_ENGINES, engine_key)
+        if engine is None:
+            engine = CalendarEngine(settings)
+            _lru_put(_ENGINES, engine_key, engine, ENGINE_CACHE_ENTRIES)
+        settings.calendar = engine
+    except INPUT_ERRORS as exc:
+        return 400, _error_body(exc), ""
+
+    try:
+        results = run_piece_level_schedule(batches, settings)
+        if request.out_dir is not None:
+            write_outputs(results, out_dir, request.lane_mode)
+            if disk is not None:
+                disk.store(key, out_dir)
+    except Exception as exc:
+        return 422, _error_body(exc), ""
+
+    response: Dict[str, Any] = {
+        "valid": results["validation"]["valid"],
+        "validation": results["validation"],
+        "operation_rows": [dict(row) for row in results["operation_rows"]],
+    }
+    if "pieces" in request.rows:
+        response["piece_rows"] = list(results["piece_rows"])
+    if "events" in request.rows:
+        response["event_rows"] = list(results["event_rows"])
+    body = _encode(response)
+    if request.use_cache:
+        _lru_put(_RESPONSES, memo_key, body, RESPONSE_CACHE_ENTRIES)
+    return 200, body, "miss"
+
+
+def resolve_out_dir(out_root: Optional[Path], out_dir: str) -> str:
+    """``out_dir`` resolved under ``out_root``; escaping paths are rejected."""
+    if out_root is None:
+        raise ValueError("out_dir is disabled on this server")
+    root = out_root.resolve()
+    target = (root / out_dir).resolve()
+    if not target.is_relative_to(root):
+        raise ValueError(f"out_dir must stay inside the server out root: {out_dir!r}")
+    return str(target)
+
+
+def _parse_query(
+    query: str,
+    payload: bytes,
+    cache_dir: Optional[str],
+    out_root: Optional[Path] = None,
+) -> ScheduleRequest:
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    lane_mode = params.get("lane_mode", "machine")
+    if lane_mode not in ("machine", "operation"):
+        raise ValueError(f"Invalid lane_mode: {lane_mode!r}")
+    machine_mode = params.get("machine_mode")
+    if machine_mode not in (None, "respect_fixed", "optimize"):
+        raise ValueError(f"Invalid machine_mode: {machine_mode!r}")
+    validate = params.get("validate")
+    if validate is not None and validate not in VALIDATE_MODES:
+        raise ValueError(f"Invalid validate: {validate!r}")
+    rows = tuple(item for item in params.get("rows", "").split(",") if item)
+    unknown = sorted(set(rows) - set(ROW_SETS))
+    if unknown:
+        raise ValueError(f"Invalid rows: {', '.join(unknown)}")
+    out_dir = params.get("out_dir")
+    if out_dir is not None:
+        out_dir = resolve_out_dir(out_root, out_dir)
+    return ScheduleRequest(
+        payload=payload,
+        lane_mode=lane_mode,
+        machine_mode=machine_mode,
+        validate=validate,
+        rows=rows,
+        out_dir=out_dir,
+        use_cache=params.get("cache", "1") != "0",
+        cache_dir=cache_dir,
+    )
+
+
+class SchedulerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        executor: Executor,
+        workers: int,
+        cache_dir: Optional[Path] = CACHE_DIR,
+        out_root: Optional[Path] = DEFAULT_OUT_ROOT,
+    ) -> None:
+        super().__init__(address, SchedulerHandler)
+        self.executor = executor
+        self.workers = workers
+        self.cache_dir = str(cache_dir) if cache_dir is not None else None
+        self.out_root = out_root
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_served += 1
+
+
+class SchedulerHandler(BaseHTTPRequestHandler):
+    server: SchedulerServer
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str) -> None:
+        self._send(status, _encode({"error": message}), {})
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/health":
+            self._error(404, f"Unknown path: {self.path}")
+            return
+        self._send(
+            200,
+            _encode(
+                {
+                    "status": "ok",
+                    "engine_version": ENGINE_VERSION,
+                    "workers": self.server.workers,
+                    "requests": self.server.requests_served,
+                }
+            ),
+            {},
+        )
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != "/schedule":
+            self._error(404, f"Unknown path: {self.path}")
+            return
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.split(";")[0].strip().lower() != "application/json":
+            self._error(415, "Content-Type must be application/json")
+            return
+        length_header = self.headers.get("Content-Length")
+        if length_header is None:
+            self._error(411, "Content-Length required")
+            return
+        try:
+            length = int(length_header)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._error(400, f"Invalid Content-Length: {length_header!r}")
+            return
+        if length > MAX_BODY_BYTES:
+            self._error(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            return
+        payload = self.rfile.read(length)
+        try:
+            request = _parse_query(
+                url.query, payload, self.server.cache_dir, self.server.out_root
+            )
+        except ValueError as exc:
+            self._error(400, str(exc))
+            return
+
+        t0 = time.perf_counter()
+        try:
+            status, body, cache_state = self.server.executor.submit(
+                handle_schedule, request
+            ).result()
+        except Exception as exc:
+            status, body, cache_state = 500, _error_body(exc), ""
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self.server.count_request()
+        headers = {"X-Schedule-Ms": f"{elapsed_ms:.1f}"}
+        if cache_state:
+            headers["X-Cache"] = cache_state
+        self._send(status, body, headers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Piece-level scheduler server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8765, help="Bind port")
+    parser.add_argument(
+        "--workers", type=int, default=2, help="Scheduler worker processes"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=CACHE_DIR,
+        help="Result cache folder used for out_dir requests",
+    )
+    parser.add_argument(
+        "--out-root",
+        type=Path,
+        default=DEFAULT_OUT_ROOT,
+        help="Folder that out_dir requests are resolved under",
+    )
+    args = parser.parse_args()
+
+    workers = max(1, args.workers)
+    executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_worker)
+    server = SchedulerServer(
+        (args.host, args.port), executor, workers, args.cache_dir, args.out_root
+    )
+    host, port = server.server_address[:2]
+    print(f"[OK] piece-level server on http://{host}:{port} workers={workers}")
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,25 +6,64 @@ Usage examples:
   python scripts/piece_level_verifier.py --demo batch3 --out-dir out
   python scripts/piece_level_verifier.py --demo batch250 --out-dir out
   python scripts/piece_level_verifier.py --input data/schedule_input.json --out-dir out
+  python scripts/piece_level_verifier.py --input data/big_plan.json --calendar-backend numpy
+  python scripts/piece_level_verifier.py --input data/month_plan.json --stream --out-dir out
+  python scripts/piece_level_verifier.py --input data/schedule_input.json --cache
+  python scripts/piece_level_verifier.py --input data/big_plan.json --profile --profile-pstats out/run.pstats
+  python scripts/piece_level_verifier.py --batch-inputs data/cells/ --jobs 4 --out-dir out/cells
   python scripts/piece_level_verifier.py --demo batch3 --live --live-delay 0.4 --live-operations 1,2,3 --live-machines "VMC 1,VMC 2,VMC 3"
 """
 
 from __future__ import annotations
 
 import argparse
+import cProfile
 import csv
+import glob
+import hashlib
+import heapq
 import json
+import os
 import re
+import shutil
+import tempfile
 import time
 import traceback
+import tracemalloc
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from itertools import accumulate
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, cast
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for calendar_backend="numpy"
+    np = None
 
 
 TIME_FMT = "%Y-%m-%d %H:%M"
 MACHINE_NAME_RE = re.compile(r"^[A-Za-z0-9 _-]+$")
+PLAN_EPOCH = datetime(2000, 1, 1)
+ONE_MINUTE = timedelta(minutes=1)
+MINUTES_PER_DAY = 24 * 60
+SETUP_HORIZON_MIN = 30 * MINUTES_PER_DAY
 
 
 class InputValidationError(ValueError):
@@ -54,26 +93,161 @@ class BatchSpec:
 @dataclass
 class Breakdown:
     machine: str
-    start: datetime
-    end: datetime
+    start: int
+    end: int
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """Daily "HH:MM-HH:MM" window compiled to minute-of-day bounds.
+
+    ``end_min <= start_min`` marks an overnight window that wraps past midnight.
+    """
+
+    start_min: int
+    end_min: int
+
+    @property
+    def overnight(self) -> bool:
+        return self.end_min <= self.start_min
+
+    def contains_minute(self, minute_of_day: int) -> bool:
+        if self.overnight:
+            return minute_of_day >= self.start_min or minute_of_day < self.end_min
+        return self.start_min <= minute_of_day < self.end_min
+
+    def contains(self, dt: datetime) -> bool:
+        return self.contains_minute(dt.hour * 60 + dt.minute)
+
+    def daily_spans(self) -> List[Tuple[int, int]]:
+        """Minute-of-day spans covered by the window; overnight gives two."""
+        if self.overnight:
+            return [
+                span
+                for span in ((0, self.end_min), (self.start_min, MINUTES_PER_DAY))
+                if span[0] < span[1]
+            ]
+        return [(self.start_min, self.end_min)]
+
+    def __str__(self) -> str:
+        return (
+            f"{self.start_min // 60:02d}:{self.start_min % 60:02d}-"
+            f"{self.end_min // 60:02d}:{self.end_min % 60:02d}"
+        )
 
 
 @dataclass
 class Settings:
-    setup_window: Tuple[str, str]
-    production_window: Tuple[str, str]
+    setup_window: TimeWindow
+    production_window: TimeWindow
     operators_by_shift: Dict[str, List[str]]
-    shifts: Dict[str, Tuple[str, str]]
+    shifts: Dict[str, TimeWindow]
     holidays: List[datetime]
     breakdowns: List[Breakdown]
     lane_mode: str = "machine"
     machine_mode: str = "respect_fixed"
+    calendar_backend: str = "segments"
+    validate_mode: str = "full"
+    holiday_index: Optional["HolidayIndex"] = field(default=None, repr=False)
+    breakdown_index: Optional["BreakdownIndex"] = field(default=None, repr=False)
+    calendar: Optional["CalendarEngine"] = field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.holiday_index is None:
+            self.holiday_index = HolidayIndex.from_datetimes(self.holidays)
+        if self.breakdown_index is None:
+            self.breakdown_index = BreakdownIndex.from_breakdowns(self.breakdowns)
 
 
 @dataclass
 class Interval:
-    start: datetime
-    end: datetime
+    """Half-open ``[start, end)`` range of plan minutes (see ``to_minute``)."""
+
+    start: int
+    end: int
+
+
+OPERATION_FIELDS = (
+    "PartNumber",
+    "Batch_ID",
+    "OperationSeq",
+    "OperationName",
+    "Machine",
+    "Operator",
+    "SetupStart",
+    "SetupEnd",
+    "RunStart",
+    "RunEnd",
+    "Status",
+    "Notes",
+)
+OPERATION_TIME_FIELDS = {
+    "SetupStart": "setup_start",
+    "SetupEnd": "setup_end",
+    "RunStart": "run_start",
+    "RunEnd": "run_end",
+}
+_OPERATION_ATTRS = dict(
+    zip(
+        OPERATION_FIELDS,
+        (
+            "part_number",
+            "batch_id",
+            "operation_seq",
+            "operation_name",
+            "machine",
+            "operator",
+            "setup_start",
+            "setup_end",
+            "run_start",
+            "run_end",
+            "status",
+            "notes",
+        ),
+    )
+)
+
+
+@dataclass(eq=False)
+class OperationRecord(Mapping[str, Any]):
+    """One scheduled operation, with its times as plan minutes.
+
+    It also reads as the ``operation_summary.csv`` row (time columns are
+    formatted on access), so row consumers keep working while checks read the
+    typed fields instead of parsing strings back.
+    """
+
+    part_number: str
+    batch_id: str
+    operation_seq: int
+    operation_name: str
+    machine: str
+    operator: str
+    setup_start: int
+    setup_end: int
+    run_start: int
+    run_end: int
+    status: str = "OK"
+    notes: str = ""
+
+    def __getitem__(self, key: str) -> Any:
+        value = getattr(self, _OPERATION_ATTRS[key])
+        return fmt_minute(value) if key in OPERATION_TIME_FIELDS else value
+
+    def __iter__(self):
+        return iter(OPERATION_FIELDS)
+
+    def __len__(self) -> int:
+        return len(OPERATION_FIELDS)
+
+
+def row_minute(row: Mapping[str, Any], key: str) -> int:
+    """Plan minute of a time column, without a parse for ``OperationRecord``s."""
+    if isinstance(row, OperationRecord):
+        return getattr(row, OPERATION_TIME_FIELDS[key])
+    return to_minute(parse_dt(str(row[key])))
 
 
 def parse_dt(value: str) -> datetime:
@@ -100,6 +274,11 @@ def parse_window(window: str) -> Tuple[str, str]:
     return parts[0], parts[1]
 
 
+def compile_window(window: str) -> TimeWindow:
+    s, e = (datetime.strptime(part, "%H:%M") for part in parse_window(window))
+    return TimeWindow(s.hour * 60 + s.minute, e.hour * 60 + e.minute)
+
+
 def _require_object(value: Any, context: str) -> Dict[str, Any]:
     if not isinstance(value, dict):
         raise InputValidationError(f"Invalid {context}: expected object")
@@ -158,33 +337,22 @@ def _validate_machine_name(name: str, context: str) -> str:
     return machine
 
 
-def minute_iter(start: datetime, end: datetime):
-    cursor = start
-    while cursor < end:
-        yield cursor
-        cursor += timedelta(minutes=1)
+def minute_iter(start: int, end: int) -> range:
+    return range(start, end)
 
 
-def day_window_contains(dt: datetime, window: Tuple[str, str]) -> bool:
-    s, e = window
-    st = datetime.combine(dt.date(), datetime.strptime(s, "%H:%M").time())
-    et = datetime.combine(dt.date(), datetime.strptime(e, "%H:%M").time())
-    if et <= st:
-        # overnight window
-        return dt >= st or dt < et
-    return st <= dt < et
+def day_window_contains(minute: int, window: TimeWindow) -> bool:
+    return window.contains_minute(minute % MINUTES_PER_DAY)
 
 
-def shift_contains_interval(
-    start: datetime, end: datetime, shift_window: Tuple[str, str]
-) -> bool:
-    s, e = shift_window
-    st = datetime.combine(start.date(), datetime.strptime(s, "%H:%M").time())
-    et = datetime.combine(start.date(), datetime.strptime(e, "%H:%M").time())
-    if et <= st:
-        et += timedelta(days=1)
+def shift_contains_interval(start: int, end: int, shift_window: TimeWindow) -> bool:
     if end <= start:
         return False
+    day_start = start - start % MINUTES_PER_DAY
+    st = day_start + shift_window.start_min
+    et = day_start + shift_window.end_min
+    if shift_window.overnight:
+        et += MINUTES_PER_DAY
     return st <= start and end <= et
 
 
@@ -192,161 +360,900 @@ def overlaps(a: Interval, b: Interval) -> bool:
     return a.start < b.end and b.start < a.end
 
 
-def is_holiday(dt: datetime, holidays: Sequence[datetime]) -> bool:
-    d = dt.date()
-    return any(h.date() == d for h in holidays)
+COUNTER_FIELDS = (
+    "operations",
+    "machine_candidates",
+    "machine_candidates_max",
+    "next_machine_free_calls",
+    "setup_searches",
+    "setup_operators_tried",
+    "setup_operators_simulated",
+    "calendar_days_compiled",
+    "calendar_segments_stepped",
+    "add_work_calls",
+    "add_work_minutes",
+    "pieces_placed_bulk",
+    "pieces_placed_stepwise",
+)
 
 
-def machine_blocked(
-    machine: str, dt: datetime, breakdowns: Sequence[Breakdown]
-) -> bool:
-    for b in breakdowns:
-        if b.machine == machine and b.start <= dt < b.end:
-            return True
-    return False
+class HotPathCounters:
+    """Work done by the scheduler core, reported as ``stats["counters"]``.
+
+    Each bump is one attribute increment, so the counters are always on. There
+    is one instance per process (``COUNTERS``), reset when a schedule starts;
+    the CLI, the process pools and the server workers run one schedule per
+    process at a time. Calendars compiled by an earlier run (a reused
+    ``CalendarEngine``) do not count towards ``calendar_days_compiled``.
+    Fallbacks to ``place_pieces_stepwise`` show up as ``pieces_placed_stepwise``
+    and as ``add_work_calls``/``add_work_minutes``.
+    """
+
+    __slots__ = COUNTER_FIELDS
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        for name in COUNTER_FIELDS:
+            setattr(self, name, 0)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in COUNTER_FIELDS}
+
+
+COUNTERS = HotPathCounters()
+
+
+class HolidayIndex:
+    """Holiday calendar keyed by plan day number (``to_minute(dt) // 1440``).
+
+    Keeps a day set for O(1) membership and the same days merged into
+    consecutive ``[first_day, end_day)`` ranges so callers can skip a whole
+    shutdown span in one step.
+    """
+
+    def __init__(self, days: Iterable[int]) -> None:
+        self.days = frozenset(days)
+        self._range_starts: List[int] = []
+        self._range_ends: List[int] = []
+        for day in sorted(self.days):
+            if self._range_ends and self._range_ends[-1] == day:
+                self._range_ends[-1] = day + 1
+            else:
+                self._range_starts.append(day)
+                self._range_ends.append(day + 1)
+
+    @classmethod
+    def from_datetimes(cls, holidays: Iterable[datetime]) -> "HolidayIndex":
+        return cls(to_minute(h) // MINUTES_PER_DAY for h in holidays)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        return list(zip(self._range_starts, self._range_ends))
+
+    def contains_day(self, day: int) -> bool:
+        return day in self.days
+
+    def contains(self, dt: datetime) -> bool:
+        return to_minute(dt) // MINUTES_PER_DAY in self.days
+
+    def next_working_day(self, day: int) -> int:
+        """First day at or after ``day`` that is not a holiday."""
+        if day not in self.days:
+            return day
+        return self._range_ends[bisect_right(self._range_starts, day) - 1]
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """Whether plan-minute interval ``[start, end)`` intersects a holiday."""
+        if end < start:
+            return False
+        idx = bisect_right(self._range_ends, start // MINUTES_PER_DAY)
+        if idx >= len(self._range_starts):
+            return False
+        return end > self._range_starts[idx] * MINUTES_PER_DAY
+
+
+def is_holiday(minute: int, holidays: HolidayIndex) -> bool:
+    return holidays.contains_day(minute // MINUTES_PER_DAY)
+
+
+class BreakdownIndex:
+    """Blocked plan-minute intervals grouped by machine and sorted by start.
+
+    The calendars want each machine's intervals merged, which is the default.
+    With ``merge=False`` every interval is kept as given (adjacent,
+    overlapping and inverted ones included) together with its position in
+    ``intervals``, so availability checks can cite the original rules.
+    ``_max_ends`` is the running maximum of the ends; it is non-decreasing,
+    so a bisect skips every interval that ends before a query starts.
+    """
+
+    def __init__(
+        self, intervals: Iterable[Tuple[str, int, int]], merge: bool = True
+    ) -> None:
+        grouped: Dict[str, List[Tuple[int, int, int]]] = {}
+        for position, (machine, start, end) in enumerate(intervals):
+            grouped.setdefault(machine, []).append((start, end, position))
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        self._max_ends: Dict[str, List[int]] = {}
+        positions: Dict[str, List[int]] = {}
+        for machine, rows in grouped.items():
+            if merge:
+                spans = merge_spans([(s, e) for s, e, _ in rows])
+                rows = [(s, e, -1) for s, e in spans]
+            else:
+                rows.sort()
+                positions[machine] = [p for _, _, p in rows]
+            self._starts[machine] = [s for s, _, _ in rows]
+            self._ends[machine] = [e for _, e, _ in rows]
+            self._max_ends[machine] = list(accumulate(self._ends[machine], max))
+        self._positions = None if merge else positions
+
+    @classmethod
+    def from_breakdowns(cls, breakdowns: Iterable[Breakdown]) -> "BreakdownIndex":
+        return cls((b.machine, b.start, b.end) for b in breakdowns)
+
+    def __len__(self) -> int:
+        return sum(len(starts) for starts in self._starts.values())
+
+    def spans(self, machine: str) -> List[Tuple[int, int]]:
+        return list(zip(self._starts.get(machine, []), self._ends.get(machine, [])))
+
+    def blocked_at(self, machine: str, minute: int) -> bool:
+        starts = self._starts.get(machine)
+        if not starts:
+            return False
+        idx = bisect_right(starts, minute) - 1
+        return idx >= 0 and minute < self._max_ends[machine][idx]
+
+    def overlapping(self, machine: str, start: int, end: int) -> List[int]:
+        """Input positions of the intervals meeting the open ``(start, end)``.
+
+        Positions come back ascending, i.e. in input order. Only an unmerged
+        index keeps positions.
+        """
+        if self._positions is None:
+            raise ValueError("overlapping() needs an index built with merge=False")
+        starts = self._starts.get(machine)
+        if not starts:
+            return []
+        ends = self._ends[machine]
+        positions = self._positions[machine]
+        first = bisect_right(self._max_ends[machine], start)
+        last = bisect_left(starts, end)
+        return sorted(positions[i] for i in range(first, last) if ends[i] > start)
+
+
+def machine_blocked(machine: str, minute: int, breakdowns: BreakdownIndex) -> bool:
+    return breakdowns.blocked_at(machine, minute)
+
+
+class OccupancyCalendar:
+    """Busy time of one resource as sorted, merged plan-minute spans.
+
+    ``intervals`` keeps every booked interval as given (validation reports
+    overlaps from it); the merged spans answer free-time queries by bisect.
+    """
+
+    def __init__(self) -> None:
+        self.intervals: List[Interval] = []
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def add(self, interval: Interval) -> None:
+        self.intervals.append(interval)
+        start, end = interval.start, interval.end
+        if end <= start:
+            return
+        lo = bisect_left(self._ends, start)
+        hi = bisect_right(self._starts, end)
+        if lo < hi:
+            start = min(start, self._starts[lo])
+            end = max(end, self._ends[hi - 1])
+        self._starts[lo:hi] = [start]
+        self._ends[lo:hi] = [end]
+
+    def spans(self) -> List[Tuple[int, int]]:
+        return list(zip(self._starts, self._ends))
+
+    def next_free(self, minute: int) -> int:
+        """First minute at or after ``minute`` not covered by a busy span."""
+        idx = bisect_right(self._starts, minute) - 1
+        if idx >= 0 and minute < self._ends[idx]:
+            return self._ends[idx]
+        return minute
+
+    def free_gap(self, minute: int) -> Tuple[int, Optional[int]]:
+        """Next free minute and the length of the free gap starting there.
+
+        The length is ``None`` when nothing is booked after that minute.
+        """
+        start = self.next_free(minute)
+        idx = bisect_right(self._starts, start)
+        if idx >= len(self._starts):
+            return start, None
+        return start, self._starts[idx] - start
+
+    def earliest_gap(self, minute: int, duration: int) -> int:
+        """Earliest start at or after ``minute`` of a free gap of ``duration``."""
+        cursor = self.next_free(minute)
+        idx = bisect_right(self._starts, cursor)
+        while idx < len(self._starts) and self._starts[idx] - cursor < duration:
+            cursor = self._ends[idx]
+            idx += 1
+        return cursor
 
 
 def next_machine_free(
-    machine: str, start: datetime, machine_cal: Dict[str, List[Interval]]
-) -> datetime:
-    cursor = start
-    while True:
-        hit = None
-        for interval in machine_cal.get(machine, []):
-            if interval.start <= cursor < interval.end:
-                hit = interval
-                break
-        if not hit:
-            return cursor
-        cursor = hit.end
+    machine: str,
+    start: int,
+    machine_cal: Dict[str, OccupancyCalendar],
+    duration: int = 0,
+) -> int:
+    """Earliest start at or after ``start`` with ``duration`` free minutes."""
+    COUNTERS.next_machine_free_calls += 1
+    cal = machine_cal.get(machine)
+    if cal is None:
+        return start
+    return cal.earliest_gap(start, duration)
 
 
 def operator_busy_minute(
-    operator: str, dt: datetime, operator_cal: Dict[str, List[Interval]]
+    operator: str, minute: int, operator_cal: Dict[str, OccupancyCalendar]
 ) -> bool:
-    for interval in operator_cal.get(operator, []):
-        if interval.start <= dt < interval.end:
-            return True
-    return False
+    cal = operator_cal.get(operator)
+    if cal is None:
+        return False
+    return cal.next_free(minute) != minute
 
 
 def is_setup_minute_allowed(
-    dt: datetime,
+    minute: int,
     machine: str,
     operator: str,
     settings: Settings,
 ) -> bool:
-    if is_holiday(dt, settings.holidays):
+    if is_holiday(minute, settings.holiday_index):
         return False
-    if machine_blocked(machine, dt, settings.breakdowns):
+    if machine_blocked(machine, minute, settings.breakdown_index):
         return False
-    if not day_window_contains(dt, settings.setup_window):
+    if not day_window_contains(minute, settings.setup_window):
         return False
-    return day_window_contains(dt, settings.shifts[operator])
+    return day_window_contains(minute, settings.shifts[operator])
 
 
-def is_run_minute_allowed(dt: datetime, machine: str, settings: Settings) -> bool:
-    if is_holiday(dt, settings.holidays):
+def is_run_minute_allowed(minute: int, machine: str, settings: Settings) -> bool:
+    if is_holiday(minute, settings.holiday_index):
         return False
-    if machine_blocked(machine, dt, settings.breakdowns):
+    if machine_blocked(machine, minute, settings.breakdown_index):
         return False
-    return day_window_contains(dt, settings.production_window)
+    return day_window_contains(minute, settings.production_window)
+
+
+def to_minute(dt: datetime) -> int:
+    return (dt - PLAN_EPOCH) // ONE_MINUTE
+
+
+def from_minute(value: int) -> datetime:
+    return PLAN_EPOCH + timedelta(minutes=value)
+
+
+def intersect_spans(
+    left: Sequence[Tuple[int, int]], right: Sequence[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    out: List[Tuple[int, int]] = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        s = max(left[i][0], right[j][0])
+        e = min(left[i][1], right[j][1])
+        if s < e:
+            out.append((s, e))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+def merge_spans(spans: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for s, e in sorted(spans):
+        if merged and s <= merged[-1][1]:
+            if e > merged[-1][1]:
+                merged[-1] = (merged[-1][0], e)
+        else:
+            merged.append((s, e))
+    return merged
+
+
+class AvailabilityCalendar:
+    """Sorted allowed-time segments for one resource, compiled lazily by day.
+
+    A segment is a half-open ``[start, end)`` range of plan minutes (see
+    ``to_minute``). Daily window spans are laid out per day, holiday days are
+    dropped and the (sorted, merged) blocked intervals are cut out, so queries
+    jump across whole segments instead of testing every minute.
+    """
+
+    CHUNK_DAYS = 32
+
+    def __init__(
+        self,
+        spans: Sequence[Tuple[int, int]],
+        holidays: HolidayIndex,
+        blocked: Sequence[Tuple[int, int]],
+    ) -> None:
+        self._spans = list(spans)
+        self._holidays = holidays
+        self._blocked = list(blocked)
+        self._blocked_ends = [e for _, e in self._blocked]
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        self._first_day = 0
+        self._end_day = 0
+
+    def _compile_days(self, first_day: int, end_day: int) -> List[Tuple[int, int]]:
+        COUNTERS.calendar_days_compiled += end_day - first_day
+        lo = first_day * MINUTES_PER_DAY
+        hi = end_day * MINUTES_PER_DAY
+        raw: List[Tuple[int, int]] = []
+        day = first_day
+        while day < end_day:
+            day = self._holidays.next_working_day(day)
+            if day >= end_day:
+                break
+            base = day * MINUTES_PER_DAY
+            day += 1
+            for s, e in self._spans:
+                if raw and raw[-1][1] == base + s:
+                    raw[-1] = (raw[-1][0], base + e)
+                else:
+                    raw.append((base + s, base + e))
+
+        idx = bisect_right(self._blocked_ends, lo)
+        blocked = []
+        while idx < len(self._blocked) and self._blocked[idx][0] < hi:
+            blocked.append(self._blocked[idx])
+            idx += 1
+        if not blocked:
+            return raw
+
+        out: List[Tuple[int, int]] = []
+        j = 0
+        for s, e in raw:
+            while j < len(blocked) and blocked[j][1] <= s:
+                j += 1
+            k = j
+            cursor = s
+            while k < len(blocked) and blocked[k][0] < e:
+                if blocked[k][0] > cursor:
+                    out.append((cursor, blocked[k][0]))
+                cursor = max(cursor, blocked[k][1])
+                k += 1
+            if cursor < e:
+                out.append((cursor, e))
+        return out
+
+    def _append(self, segments: List[Tuple[int, int]]) -> None:
+        for s, e in segments:
+            if self._ends and self._ends[-1] == s:
+                self._ends[-1] = e
+            else:
+                self._starts.append(s)
+                self._ends.append(e)
+
+    def _ensure(self, minute: int) -> None:
+        day = minute // MINUTES_PER_DAY
+        if self._first_day == self._end_day:
+            self._first_day = day
+            self._end_day = day + self.CHUNK_DAYS
+            self._append(self._compile_days(self._first_day, self._end_day))
+        elif day < self._first_day:
+            new_first = min(day, self._first_day - self.CHUNK_DAYS)
+            starts, ends = self._starts, self._ends
+            self._starts, self._ends = [], []
+            self._append(self._compile_days(new_first, self._first_day))
+            self._append(list(zip(starts, ends)))
+            self._first_day = new_first
+        while minute >= self._end_day * MINUTES_PER_DAY:
+            new_end = self._end_day + self.CHUNK_DAYS
+            self._append(self._compile_days(self._end_day, new_end))
+            self._end_day = new_end
+
+    def iter_segments(self, start: int, limit: Optional[int] = None):
+        """Yield allowed ``(start, end)`` pieces at or after ``start``.
+
+        Without a ``limit`` the calendar must have some allowed time per day,
+        otherwise nothing is yielded.
+        """
+        if not self._spans:
+            return
+        self._ensure(start)
+        idx = bisect_right(self._ends, start)
+        cursor = start
+        while limit is None or cursor < limit:
+            if idx >= len(self._ends):
+                if limit is not None and self._end_day * MINUTES_PER_DAY >= limit:
+                    return
+                self._ensure(self._end_day * MINUTES_PER_DAY)
+                # The last segment may have grown into the new chunk.
+                idx = bisect_right(self._ends, cursor)
+                continue
+            s = max(cursor, self._starts[idx])
+            e = self._ends[idx]
+            if limit is not None:
+                if s >= limit:
+                    return
+                e = min(e, limit)
+            COUNTERS.calendar_segments_stepped += 1
+            yield s, e
+            cursor = e
+            idx += 1
+
+    def next_allowed(self, start: int, limit: Optional[int] = None) -> Optional[int]:
+        for s, _ in self.iter_segments(start, limit):
+            return s
+        return None
+
+    def add_work(self, start: int, minutes: int) -> int:
+        COUNTERS.add_work_calls += 1
+        COUNTERS.add_work_minutes += max(0, minutes)
+        remaining = max(0, minutes)
+        if remaining == 0:
+            return start
+        for s, e in self.iter_segments(start):
+            if e - s >= remaining:
+                return s + remaining
+            remaining -= e - s
+        raise RuntimeError("Calendar has no allowed time")
+
+    def place_pieces(
+        self, ready: int, arrivals: Optional[Sequence[int]], qty: int, cycle: int
+    ) -> Tuple[List[int], List[int]]:
+        """Bulk ``place_pieces_stepwise`` over allowed segments.
+
+        The piece recurrence is max-plus linear once time is counted in allowed
+        minutes from the first usable minute ``S``: with ``W_i`` the count at
+        piece ``i``'s arrival, ``E_i = max(W_i, E_{i-1}) + cycle``, which
+        unrolls to ``cycle * (i + 1) + max(W_j - cycle * j for j <= i)``.
+        Counts map back to plan minutes with one forward walk over the
+        segments, so a batch inside a single segment is pure arithmetic and
+        gaps only cost one step per segment crossed.
+        """
+        if cycle <= 0 or qty <= 0 or not self._spans:
+            return place_pieces_stepwise(self, ready, arrivals, qty, cycle)
+        if arrivals:
+            arrive = [max(a, ready) for a in arrivals[:qty]]
+            if any(b < a for a, b in zip(arrive, arrive[1:])):
+                return place_pieces_stepwise(self, ready, arrivals, qty, cycle)
+        else:
+            arrive = [ready] * qty
+        COUNTERS.pieces_placed_bulk += len(arrive)
+
+        segments = self.iter_segments(arrive[0])
+        seg_starts: List[int] = []
+        seg_ends: List[int] = []
+        seg_counts: List[int] = []
+        total = 0
+
+        def pull() -> None:
+            nonlocal total
+            seg = next(segments, None)
+            if seg is None:
+                raise RuntimeError("Calendar has no allowed time")
+            seg_starts.append(seg[0])
+            seg_ends.append(seg[1])
+            seg_counts.append(total)
+            total += seg[1] - seg[0]
+
+        pull()
+        k = 0
+        offsets = []
+        for i, minute in enumerate(arrive):
+            while seg_ends[k] <= minute:
+                k += 1
+                if k == len(seg_ends):
+                    pull()
+            count = seg_counts[k] + max(0, minute - seg_starts[k])
+            offsets.append(count - cycle * i)
+        ends = [
+            best + cycle * (i + 1)
+            for i, best in enumerate(accumulate(offsets, max))
+        ]
+
+        k = 0
+        starts_out: List[int] = []
+        ends_out: List[int] = []
+        for end in ends:
+            first = end - cycle
+            while seg_counts[k] + seg_ends[k] - seg_starts[k] <= first:
+                k += 1
+                if k == len(seg_ends):
+                    pull()
+            starts_out.append(seg_starts[k] + first - seg_counts[k])
+            while seg_counts[k] + seg_ends[k] - seg_starts[k] < end:
+                k += 1
+                if k == len(seg_ends):
+                    pull()
+            ends_out.append(seg_starts[k] + end - seg_counts[k])
+        return starts_out, ends_out
+
+
+def place_pieces_stepwise(
+    cal: Any, ready: int, arrivals: Optional[Sequence[int]], qty: int, cycle: int
+) -> Tuple[List[int], List[int]]:
+    """Run ``qty`` pieces one after another on ``cal``, no earlier than ``ready``.
+
+    Piece ``i`` starts at the first allowed minute after its arrival (or
+    ``ready`` for a first operation) and the previous piece's end.
+    """
+    COUNTERS.pieces_placed_stepwise += max(0, qty)
+    starts: List[int] = []
+    ends: List[int] = []
+    prev = ready
+    for i in range(qty):
+        arrival = arrivals[i] if arrivals else ready
+        run_start = cal.next_allowed(max(arrival, prev, ready))
+        if run_start is None:
+            raise RuntimeError("Calendar has no allowed time")
+        prev = cal.add_work(run_start, cycle)
+        starts.append(run_start)
+        ends.append(prev)
+    return starts, ends
+
+
+class MinuteMaskCalendar:
+    """NumPy allowed-minute mask for one resource, with a running count.
+
+    ``_cum[k]`` is the number of allowed minutes in ``[origin, origin + k)``, so
+    adding working minutes and finding the next allowed minute are both a
+    ``searchsorted`` on ``_cum``. The mask covers whole days and is rebuilt
+    (doubling its length) whenever a query runs past either end.
+    """
+
+    CHUNK_DAYS = 64
+
+    def __init__(
+        self,
+        spans: Sequence[Tuple[int, int]],
+        holidays: HolidayIndex,
+        blocked: Sequence[Tuple[int, int]],
+    ) -> None:
+        self._spans = list(spans)
+        self._holidays = holidays
+        self._blocked = list(blocked)
+        self._first_day = 0
+        self._end_day = 0
+        self._origin = 0
+        self._mask = np.zeros(0, dtype=bool)
+        self._cum = np.zeros(1, dtype=np.int64)
+
+    def _build(self, first_day: int, end_day: int) -> None:
+        day_mask = np.zeros(MINUTES_PER_DAY, dtype=bool)
+        for s, e in self._spans:
+            day_mask[s:e] = True
+        mask = np.tile(day_mask, end_day - first_day)
+        lo = first_day * MINUTES_PER_DAY
+        hi = end_day * MINUTES_PER_DAY
+        for s_day, e_day in self._holidays.ranges():
+            s, e = s_day * MINUTES_PER_DAY, e_day * MINUTES_PER_DAY
+            if s < hi and e > lo:
+                mask[max(s, lo) - lo : min(e, hi) - lo] = False
+        for s, e in self._blocked:
+            if s < hi and e > lo:
+                mask[max(s, lo) - lo : min(e, hi) - lo] = False
+        self._first_day = first_day
+        self._end_day = end_day
+        self._origin = lo
+        self._mask = mask
+        self._cum = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+
+    def _ensure(self, lo: int, hi: int) -> None:
+        """Cover plan minutes ``[lo, hi]``, at least doubling when extending."""
+        first = lo // MINUTES_PER_DAY
+        end = hi // MINUTES_PER_DAY + 1
+        if self._first_day < self._end_day:
+            if first >= self._first_day and end <= self._end_day:
+                return
+            size = self._end_day - self._first_day
+            if first < self._first_day:
+                first = min(first, self._first_day - size)
+            else:
+                first = self._first_day
+            if end > self._end_day:
+                end = max(end, self._end_day + size)
+            else:
+                end = self._end_day
+        else:
+            end = max(end, first + self.CHUNK_DAYS)
+        self._build(first, end)
+
+    def _grow(self) -> None:
+        self._ensure(self._origin, self._end_day * MINUTES_PER_DAY)
+
+    def _count(self, minute: int) -> int:
+        return int(self._cum[minute - self._origin])
+
+    def next_allowed(self, start: int, limit: Optional[int] = None) -> Optional[int]:
+        if not self._spans:
+            return None
+        self._ensure(start, start)
+        target = self._count(start) + 1
+        while target > self._cum[-1]:
+            if limit is not None and self._end_day * MINUTES_PER_DAY >= limit:
+                return None
+            self._grow()
+            target = self._count(start) + 1
+        minute = int(np.searchsorted(self._cum, target)) - 1 + self._origin
+        if limit is not None and minute >= limit:
+            return None
+        return minute
+
+    def iter_segments(self, start: int, limit: Optional[int] = None):
+        cursor = start
+        while limit is None or cursor < limit:
+            s = self.next_allowed(cursor, limit)
+            if s is None:
+                return
+            rel = s - self._origin
+            while self._mask[rel:].all():
+                self._grow()
+                rel = s - self._origin
+            e = s + int(np.argmin(self._mask[rel:]))
+            if limit is not None:
+                e = min(e, limit)
+            yield s, e
+            cursor = e
+
+    def add_work(self, start: int, minutes: int) -> int:
+        COUNTERS.add_work_calls += 1
+        COUNTERS.add_work_minutes += max(0, minutes)
+        if minutes <= 0:
+            return start
+        if not self._spans:
+            raise RuntimeError("Calendar has no allowed time")
+        self._ensure(start, start)
+        while self._count(start) + minutes > self._cum[-1]:
+            self._grow()
+        target = self._count(start) + minutes
+        return int(np.searchsorted(self._cum, target)) + self._origin
+
+    def place_pieces(
+        self, ready: int, arrivals: Optional[Sequence[int]], qty: int, cycle: int
+    ) -> Tuple[List[int], List[int]]:
+        """Vectorised ``place_pieces_stepwise`` for a positive cycle time.
+
+        Counted in allowed minutes, piece ``i`` ends at
+        ``max(arrival_i, end_{i-1}) + cycle``; that recurrence unrolls to a
+        running maximum, and one ``searchsorted`` maps the counts back to
+        plan minutes.
+        """
+        if cycle <= 0 or qty <= 0 or not self._spans:
+            return place_pieces_stepwise(self, ready, arrivals, qty, cycle)
+        if arrivals:
+            arrive = np.maximum(np.asarray(arrivals[:qty], dtype=np.int64), ready)
+        else:
+            arrive = np.full(qty, ready, dtype=np.int64)
+        self._ensure(int(arrive.min()), int(arrive.max()))
+        COUNTERS.pieces_placed_bulk += len(arrive)
+        steps = np.arange(qty, dtype=np.int64) * cycle
+        counts = self._cum[arrive - self._origin]
+        ends = np.maximum.accumulate(counts - steps) + steps + cycle
+        while ends[-1] > self._cum[-1]:
+            self._grow()
+            counts = self._cum[arrive - self._origin]
+            ends = np.maximum.accumulate(counts - steps) + steps + cycle
+        run_ends = np.searchsorted(self._cum, ends) + self._origin
+        run_starts = np.searchsorted(self._cum, ends - cycle + 1) - 1 + self._origin
+        return run_starts.tolist(), run_ends.tolist()
+
+
+CALENDAR_BACKENDS = ("segments", "numpy")
+
+
+class CalendarEngine:
+    """Per-machine run calendars and per machine/operator setup calendars.
+
+    ``calendar_backend="numpy"`` swaps the run calendars for minute masks;
+    setup calendars stay segment based because the operator search walks
+    their segments directly.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        if settings.calendar_backend not in CALENDAR_BACKENDS:
+            raise ValueError(
+                f"Unknown calendar_backend: {settings.calendar_backend!r}"
+            )
+        if settings.calendar_backend == "numpy" and np is None:
+            raise RuntimeError(
+                "calendar_backend 'numpy' requires NumPy; install it or use 'segments'"
+            )
+        self.settings = settings
+        self._run_cls = (
+            MinuteMaskCalendar
+            if settings.calendar_backend == "numpy"
+            else AvailabilityCalendar
+        )
+        self._holidays = cast(HolidayIndex, settings.holiday_index)
+        self._breakdowns = cast(BreakdownIndex, settings.breakdown_index)
+        self._run_spans = settings.production_window.daily_spans()
+        self._setup_spans = settings.setup_window.daily_spans()
+        self._run: Dict[str, Any] = {}
+        self._setup: Dict[Tuple[str, str], AvailabilityCalendar] = {}
+
+    def run_calendar(self, machine: str) -> Any:
+        cal = self._run.get(machine)
+        if cal is None:
+            cal = self._run_cls(
+                self._run_spans, self._holidays, self._breakdowns.spans(machine)
+            )
+            self._run[machine] = cal
+        return cal
+
+    def setup_calendar(self, machine: str, operator: str) -> AvailabilityCalendar:
+        key = (machine, operator)
+        cal = self._setup.get(key)
+        if cal is None:
+            spans = intersect_spans(
+                self._setup_spans, self.settings.shifts[operator].daily_spans()
+            )
+            cal = AvailabilityCalendar(
+                spans, self._holidays, self._breakdowns.spans(machine)
+            )
+            self._setup[key] = cal
+        return cal
+
+
+def calendar_for(settings: Settings) -> CalendarEngine:
+    if settings.calendar is None:
+        settings.calendar = CalendarEngine(settings)
+    return settings.calendar
 
 
 def add_work_minutes(
-    start: datetime,
+    start: int,
     minutes: int,
     machine: str,
     settings: Settings,
     mode: str,
     operator: Optional[str] = None,
-) -> datetime:
-    remaining = max(0, minutes)
-    cursor = start
-    while remaining > 0:
-        if mode == "setup":
-            assert operator is not None
-            if is_setup_minute_allowed(cursor, machine, operator, settings):
-                remaining -= 1
-        else:
-            if is_run_minute_allowed(cursor, machine, settings):
-                remaining -= 1
-        cursor += timedelta(minutes=1)
-    return cursor
+) -> int:
+    engine = calendar_for(settings)
+    if mode == "setup":
+        assert operator is not None
+        cal = engine.setup_calendar(machine, operator)
+    else:
+        cal = engine.run_calendar(machine)
+    return cal.add_work(start, minutes)
+
+
+def next_allowed_run_start(start: int, machine: str, settings: Settings) -> int:
+    minute = calendar_for(settings).run_calendar(machine).next_allowed(start)
+    if minute is None:
+        raise RuntimeError("Calendar has no allowed time")
+    return minute
+
+
+def _earliest_setup_minute(
+    cal: AvailabilityCalendar, busy: OccupancyCalendar, start: int, limit: int
+) -> Optional[int]:
+    """First minute at or after ``start`` where the operator could do setup."""
+    for seg_start, seg_end in cal.iter_segments(start, limit):
+        cursor, _ = busy.free_gap(seg_start)
+        if cursor < seg_end:
+            return cursor
+    return None
 
 
-def next_allowed_run_start(
-    start: datetime, machine: str, settings: Settings
-) -> datetime:
+def _simulate_setup(
+    cal: AvailabilityCalendar,
+    busy: OccupancyCalendar,
+    start: int,
+    limit: int,
+    duration_min: int,
+    cutoff: Optional[int],
+) -> Optional[Tuple[int, int, List[Interval]]]:
+    """Book ``duration_min`` setup minutes from ``start`` across free segments.
+
+    Returns ``(setup_start, setup_end, segments)`` in plan minutes, or None when
+    the setup does not finish inside ``limit`` or cannot finish by ``cutoff``.
+    """
+    remaining = max(0, duration_min)
+    setup_start: Optional[int] = None
+    setup_segments: List[Interval] = []
     cursor = start
-    while not is_run_minute_allowed(cursor, machine, settings):
-        cursor += timedelta(minutes=1)
-    return cursor
+
+    for seg_start, seg_end in cal.iter_segments(start, limit):
+        cursor = seg_start
+        while cursor < seg_end and remaining > 0:
+            cursor, gap = busy.free_gap(cursor)
+            if cursor >= seg_end:
+                break
+            if cutoff is not None and cursor + remaining > cutoff:
+                return None
+            take_end = seg_end if gap is None else min(seg_end, cursor + gap)
+            take_end = min(take_end, cursor + remaining)
+            if setup_start is None:
+                setup_start = cursor
+            if setup_segments and setup_segments[-1].end == cursor:
+                setup_segments[-1].end = take_end
+            else:
+                setup_segments.append(Interval(cursor, take_end))
+            remaining -= take_end - cursor
+            cursor = take_end
+        if remaining == 0:
+            break
+        if cutoff is not None and cursor + remaining > cutoff:
+            return None
+
+    if remaining > 0 or setup_start is None:
+        return None
+    return setup_start, cursor, setup_segments
 
 
 def find_setup_slot(
-    candidate_start: datetime,
+    candidate_start: int,
     duration_min: int,
     machine: str,
     settings: Settings,
-    operator_cal: Dict[str, List[Interval]],
-) -> Tuple[datetime, datetime, str, List[Interval], List[str]]:
+    operator_cal: Dict[str, OccupancyCalendar],
+) -> Tuple[int, int, str, List[Interval], List[str]]:
     logs: List[str] = []
     all_operators = [
         op for shift_ops in settings.operators_by_shift.values() for op in shift_ops
     ]
     unique_ops = list(dict.fromkeys(all_operators))
-    horizon_end = candidate_start + timedelta(days=30)
-    best_payload = None
-
-    for op in unique_ops:
-        cursor = candidate_start
-        remaining = max(0, duration_min)
-        setup_start: Optional[datetime] = None
-        setup_segments: List[Interval] = []
-        segment_start: Optional[datetime] = None
-
-        while cursor < horizon_end and remaining > 0:
-            allowed = is_setup_minute_allowed(cursor, machine, op, settings)
-            if allowed and not operator_busy_minute(op, cursor, operator_cal):
-                if setup_start is None:
-                    setup_start = cursor
-                if segment_start is None:
-                    segment_start = cursor
-                remaining -= 1
-            else:
-                if segment_start is not None:
-                    setup_segments.append(Interval(segment_start, cursor))
-                    segment_start = None
-
-            cursor += timedelta(minutes=1)
-
-        if remaining > 0 or setup_start is None:
+    engine = calendar_for(settings)
+    window_start = candidate_start
+    horizon_end = window_start + SETUP_HORIZON_MIN
+    remaining = max(0, duration_min)
+
+    # Branch and bound: no operator can finish before its first usable minute
+    # plus the full setup duration, so visit them by that bound and stop once
+    # the bound can no longer beat the best finish.  Ties keep the original
+    # rule: earliest setup_end, then first operator in ``unique_ops`` order.
+    COUNTERS.setup_searches += 1
+    COUNTERS.setup_operators_tried += len(unique_ops)
+    candidates = []
+    for index, op in enumerate(unique_ops):
+        cal = engine.setup_calendar(machine, op)
+        busy = operator_cal.get(op) or OccupancyCalendar()
+        first = _earliest_setup_minute(cal, busy, window_start, horizon_end)
+        if first is not None:
+            candidates.append((first + remaining, index, op, cal, busy))
+    candidates.sort(key=lambda item: (item[0], item[1]))
+
+    best: Optional[Tuple[int, int, str, int, List[Interval]]] = None
+    for bound, index, op, cal, busy in candidates:
+        cutoff: Optional[int] = None
+        if best is not None:
+            best_end, best_index = best[0], best[1]
+            if (bound, index) > (best_end, best_index):
+                break
+            cutoff = best_end if index < best_index else best_end - 1
+        COUNTERS.setup_operators_simulated += 1
+        found = _simulate_setup(
+            cal, busy, window_start, horizon_end, duration_min, cutoff
+        )
+        if found is None:
             continue
+        start_min, end_min, segments = found
+        best = (end_min, index, op, start_min, segments)
 
-        if segment_start is not None:
-            setup_segments.append(Interval(segment_start, cursor))
-
-        setup_end = cursor
-        if best_payload is None or setup_end < best_payload["setup_end"]:
-            best_payload = {
-                "operator": op,
-                "setup_start": setup_start,
-                "setup_end": setup_end,
-                "segments": setup_segments,
-            }
-
-    if best_payload is None:
+    if best is None:
         raise RuntimeError("Could not find setup slot within 30 days")
 
-    setup_start = cast(datetime, best_payload["setup_start"])
-    setup_end = cast(datetime, best_payload["setup_end"])
-    op = cast(str, best_payload["operator"])
-    setup_segments = cast(List[Interval], best_payload["segments"])
-    total_span = int((setup_end - setup_start).total_seconds() // 60)
-    paused_min = max(0, total_span - duration_min)
+    setup_end, _, op, setup_start, setup_segments = best
+    paused_min = max(0, setup_end - setup_start - duration_min)
     logs.append(
-        f"[SETUP-ASSIGN] machine={machine} operator={op} setup_start={fmt(setup_start)} setup_end={fmt(setup_end)} active_min={duration_min} paused_min={paused_min}"
+        f"[SETUP-ASSIGN] machine={machine} operator={op} setup_start={fmt_minute(setup_start)} setup_end={fmt_minute(setup_end)} active_min={duration_min} paused_min={paused_min}"
     )
     return setup_start, setup_end, op, setup_segments, logs
 
@@ -355,7 +1262,284 @@ def fmt(dt: datetime) -> str:
     return dt.strftime(TIME_FMT)
 
 
-def build_live_event_rows(piece_rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def fmt_minute(value: int) -> str:
+    return fmt(from_minute(value))
+
+
+class StringTable:
+    """Interned strings: each distinct value is stored once, rows keep its id."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        idx = self._ids.get(value)
+        if idx is None:
+            idx = len(self.values)
+            self._ids[value] = idx
+            self.values.append(value)
+        return idx
+
+    def __getitem__(self, idx: int) -> str:
+        return self.values[idx]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+PIECE_FIELDS = (
+    "PartNumber",
+    "Batch_ID",
+    "Piece",
+    "OperationSeq",
+    "OperationName",
+    "Machine",
+    "Operator",
+    "ArrivalFromPrevOp",
+    "RunStart",
+    "RunEnd",
+    "WaitMin",
+)
+
+
+def piece_row(
+    part: str,
+    batch: str,
+    piece: int,
+    op_seq: int,
+    op_name: str,
+    machine: str,
+    operator: str,
+    arrival: int,
+    start: int,
+    end: int,
+) -> Dict[str, Any]:
+    """The ``piece_timeline.csv`` row for one piece of one operation."""
+    return {
+        "PartNumber": part,
+        "Batch_ID": batch,
+        "Piece": piece,
+        "OperationSeq": op_seq,
+        "OperationName": op_name,
+        "Machine": machine,
+        "Operator": operator,
+        "ArrivalFromPrevOp": fmt_minute(arrival),
+        "RunStart": fmt_minute(start),
+        "RunEnd": fmt_minute(end),
+        "WaitMin": start - arrival,
+    }
+
+
+EVENT_FIELDS = (
+    "PartNumber",
+    "Batch_ID",
+    "Piece",
+    "OperationSeq",
+    "OperationName",
+    "Machine",
+    "Event",
+    "EventTime",
+    "BatchClock",
+    "Message",
+)
+
+
+def event_row(
+    part: str,
+    batch: str,
+    piece: int,
+    op_seq: int,
+    op_name: str,
+    machine: str,
+    rank: int,
+    ts: int,
+    anchor: int,
+) -> Dict[str, Any]:
+    """The ``piece_live_events.csv`` row of a START (rank 0) or END (rank 1)."""
+    if rank:
+        name = "END"
+        message = f"DONE P{piece} @ OP{op_seq} ({op_name}) on {machine}"
+    else:
+        name = "START"
+        message = f"MOVE P{piece} -> OP{op_seq} ({op_name}) on {machine}"
+    elapsed = ts - anchor
+    return {
+        "PartNumber": part,
+        "Batch_ID": batch,
+        "Piece": piece,
+        "OperationSeq": op_seq,
+        "OperationName": op_name,
+        "Machine": machine,
+        "Event": name,
+        "EventTime": fmt_minute(ts),
+        "BatchClock": f"T+{elapsed // 60:02d}:{elapsed % 60:02d}",
+        "Message": message,
+    }
+
+
+class PieceTable(Sequence[Dict[str, Any]]):
+    """Piece timeline stored as columns, one entry per piece per operation.
+
+    Times are plan-minute ``array`` columns and the text columns hold ids into
+    per-column ``StringTable``s. Indexing returns the same row dict the
+    timeline CSV is written from, built on demand, so existing row consumers
+    keep working while writers and validators can read the columns directly.
+    """
+
+    def __init__(self) -> None:
+        self.parts = StringTable()
+        self.batches = StringTable()
+        self.op_names = StringTable()
+        self.machines = StringTable()
+        self.operators = StringTable()
+        self.part_ids = array("i")
+        self.batch_ids = array("i")
+        self.op_name_ids = array("i")
+        self.machine_ids = array("i")
+        self.operator_ids = array("i")
+        self.pieces = array("i")
+        self.op_seqs = array("i")
+        self.arrivals = array("q")
+        self.starts = array("q")
+        self.ends = array("q")
+        self.run_starts = array("q")
+
+    def add_operation(
+        self,
+        part: str,
+        batch: str,
+        op_seq: int,
+        op_name: str,
+        machine: str,
+        operator: str,
+        arrivals: Sequence[int],
+        starts: Sequence[int],
+        ends: Sequence[int],
+    ) -> None:
+        """Append pieces ``1..len(starts)`` of one scheduled operation."""
+        count = len(starts)
+        self.run_starts.append(len(self.starts))
+        self.part_ids.extend([self.parts.intern(part)] * count)
+        self.batch_ids.extend([self.batches.intern(batch)] * count)
+        self.op_name_ids.extend([self.op_names.intern(op_name)] * count)
+        self.machine_ids.extend([self.machines.intern(machine)] * count)
+        self.operator_ids.extend([self.operators.intern(operator)] * count)
+        self.pieces.extend(range(1, count + 1))
+        self.op_seqs.extend([op_seq] * count)
+        self.arrivals.extend(arrivals)
+        self.starts.extend(starts)
+        self.ends.extend(ends)
+
+    def add_scheduled(self, scheduled: "ScheduledOperation") -> None:
+        record = scheduled.record
+        self.add_operation(
+            record.part_number,
+            record.batch_id,
+            record.operation_seq,
+            record.operation_name,
+            record.machine,
+            record.operator,
+            scheduled.arrivals,
+            scheduled.starts,
+            scheduled.ends,
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def runs(self) -> List[Tuple[int, int]]:
+        """Row range ``[lo, hi)`` of each operation, in scheduling order."""
+        bounds = list(self.run_starts) + [len(self.starts)]
+        return list(zip(bounds, bounds[1:]))
+
+    def row(self, idx: int) -> Dict[str, Any]:
+        return piece_row(
+            self.parts[self.part_ids[idx]],
+            self.batches[self.batch_ids[idx]],
+            self.pieces[idx],
+            self.op_seqs[idx],
+            self.op_names[self.op_name_ids[idx]],
+            self.machines[self.machine_ids[idx]],
+            self.operators[self.operator_ids[idx]],
+            self.arrivals[idx],
+            self.starts[idx],
+            self.ends[idx],
+        )
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self.row(i) for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("piece row index out of range")
+        return self.row(idx)
+
+    def __iter__(self):
+        return (self.row(i) for i in range(len(self)))
+
+
+class EventTable:
+    """Live START/END events of a ``PieceTable`` in replay order.
+
+    Nothing is materialized or sorted: iterating k-way merges the per-operation
+    event streams (see ``operation_events``) with ``heapq.merge`` and renders
+    each row as it is reached, so each pass is O(n log k) for k operations.
+    """
+
+    def __init__(self, pieces: PieceTable) -> None:
+        self.pieces = pieces
+        anchors: Dict[Tuple[int, int], int] = {}
+        for part_id, batch_id, start in zip(
+            pieces.part_ids, pieces.batch_ids, pieces.starts
+        ):
+            key = (part_id, batch_id)
+            if key not in anchors or start < anchors[key]:
+                anchors[key] = start
+        self._anchors = anchors
+
+    def __len__(self) -> int:
+        return 2 * len(self.pieces)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        t = self.pieces
+        runs = t.runs()
+        streams = [
+            operation_events(
+                run_idx,
+                t.op_seqs[lo],
+                (t.starts[i] for i in range(lo, hi)),
+                (t.ends[i] for i in range(lo, hi)),
+            )
+            for run_idx, (lo, hi) in enumerate(runs)
+            if hi > lo
+        ]
+        for ts, rank, op_seq, piece, run_idx in heapq.merge(*streams):
+            idx = runs[run_idx][0] + piece - 1
+            yield event_row(
+                t.parts[t.part_ids[idx]],
+                t.batches[t.batch_ids[idx]],
+                piece,
+                op_seq,
+                t.op_names[t.op_name_ids[idx]],
+                t.machines[t.machine_ids[idx]],
+                rank,
+                ts,
+                self._anchors[(t.part_ids[idx], t.batch_ids[idx])],
+            )
+
+
+def build_live_event_rows(
+    piece_rows: Sequence[Dict[str, Any]],
+) -> Iterable[Dict[str, Any]]:
+    """Live events in ``(time, rank, op, piece)`` order.
+
+    A ``PieceTable`` gets a lazy merged ``EventTable``; plain row dicts are
+    parsed and sorted in memory.
+    """
+    if isinstance(piece_rows, PieceTable):
+        return EventTable(piece_rows)
     if not piece_rows:
         return []
 
@@ -407,6 +1591,106 @@ def build_live_event_rows(piece_rows: Sequence[Dict[str, Any]]) -> List[Dict[str
     return [record[4] for record in event_records]
 
 
+EventKey = Tuple[int, int, int, int, int]
+
+
+def operation_events(
+    run_idx: int, op_seq: int, starts: Sequence[int], ends: Sequence[int]
+) -> Iterator[EventKey]:
+    """START and END events of one operation as ``(time, rank, op, piece, run)``.
+
+    Piece starts and ends are each non-decreasing, so merging the two streams
+    yields the operation's events already in timeline order.
+    """
+    started = ((ts, 0, op_seq, piece, run_idx) for piece, ts in enumerate(starts, 1))
+    ended = ((ts, 1, op_seq, piece, run_idx) for piece, ts in enumerate(ends, 1))
+    return heapq.merge(started, ended)
+
+
+class EventSpill:
+    """Live events spilled to disk per operation and k-way merged back.
+
+    Each operation's events are written as one sorted run to a single
+    temporary file; iterating merges the runs with ``heapq.merge``, reading
+    each run in small blocks, so memory stays bounded by the number of runs
+    rather than the number of events. The run index is the last merge key,
+    which reproduces the stable-sort tie order of the in-memory builder.
+    """
+
+    BLOCK_LINES = 256
+
+    def __init__(self) -> None:
+        self._file = tempfile.TemporaryFile("w+b")
+        self._runs: List[Tuple[int, int]] = []
+        self._meta: List[Tuple[str, str, int, str, str]] = []
+        self._anchors: Dict[Tuple[str, str], int] = {}
+        self.count = 0
+
+    def add_operation(self, scheduled: ScheduledOperation) -> None:
+        record = scheduled.record
+        run_idx = len(self._runs)
+        key = (record.part_number, record.batch_id)
+        if scheduled.starts:
+            first = min(scheduled.starts)
+            if key not in self._anchors or first < self._anchors[key]:
+                self._anchors[key] = first
+        events = operation_events(
+            run_idx, record.operation_seq, scheduled.starts, scheduled.ends
+        )
+        lines = [f"{ts} {rank} {piece}\n" for ts, rank, _, piece, _ in events]
+        self._file.seek(0, 2)
+        self._runs.append((self._file.tell(), len(lines)))
+        self._file.write("".join(lines).encode("ascii"))
+        self._meta.append(
+            (
+                record.part_number,
+                record.batch_id,
+                record.operation_seq,
+                record.operation_name,
+                record.machine,
+            )
+        )
+        self.count += len(lines)
+
+    def _read_run(self, run_idx: int) -> Iterator[EventKey]:
+        pos, remaining = self._runs[run_idx]
+        op_seq = self._meta[run_idx][2]
+        while remaining > 0:
+            self._file.seek(pos)
+            block = [
+                self._file.readline()
+                for _ in range(min(self.BLOCK_LINES, remaining))
+            ]
+            pos = self._file.tell()
+            remaining -= len(block)
+            for line in block:
+                ts, rank, piece = line.split()
+                yield int(ts), int(rank), op_seq, int(piece), run_idx
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._file.flush()
+        runs = [self._read_run(i) for i in range(len(self._runs))]
+        for ts, rank, op_seq, piece, run_idx in heapq.merge(*runs):
+            part, batch, _, op_name, machine = self._meta[run_idx]
+            yield event_row(
+                part,
+                batch,
+                piece,
+                op_seq,
+                op_name,
+                machine,
+                rank,
+                ts,
+                self._anchors[(part, batch)],
+            )
+
+    def close(self) -> None:
+        self._file.close()
+
+
 def parse_int_filter(raw: str) -> Optional[Set[int]]:
     text = raw.strip()
     if not text:
@@ -435,7 +1719,7 @@ def parse_machine_filter(raw: str) -> Optional[Set[str]]:
 
 
 def replay_live_events(
-    event_rows: Sequence[Dict[str, Any]],
+    event_rows: Iterable[Mapping[str, Any]],
     delay_s: float,
     max_piece: int,
     op_filter: Optional[Set[int]],
@@ -470,21 +1754,217 @@ def replay_live_events(
             time.sleep(delay_s)
 
 
-def run_piece_level_schedule(
-    batches: Sequence[BatchSpec], settings: Settings
-) -> Dict[str, Any]:
-    machine_cal: Dict[str, List[Interval]] = {}
-    operator_cal: Dict[str, List[Interval]] = {op: [] for op in settings.shifts}
+class PhaseProfiler:
+    """Wall time, CPU time and tracemalloc peak per named phase (``--profile``).
+
+    Phases may nest and repeat: repeated entries accumulate, and a parent's
+    figures include its children's. ``peak_bytes`` is the highest traced
+    memory above the level at phase entry. Tracing (and ``pstats_path``, which
+    runs cProfile until ``finish``) slows the code being measured, so compare
+    profiled runs with each other, not with plain runs.
+    """
+
+    def __init__(
+        self, memory: bool = True, pstats_path: Optional[Path] = None
+    ) -> None:
+        self.memory = memory
+        self.pstats_path = pstats_path
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[List[int]] = []
+        self._started_tracing = False
+        self._cprofile: Optional[cProfile.Profile] = None
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if pstats_path is not None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._t0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        frame = [0, 0]
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+        self._stack.append(frame)
+        t0 = time.perf_counter()
+        cpu0 = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - t0
+            cpu = time.process_time() - cpu0
+            self._stack.pop()
+            entry = self.phases.setdefault(
+                name, {"calls": 0, "wall_sec": 0.0, "cpu_sec": 0.0, "peak_bytes": 0}
+            )
+            entry["calls"] += 1
+            entry["wall_sec"] += wall
+            entry["cpu_sec"] += cpu
+            if self.memory:
+                frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+                entry["peak_bytes"] = max(entry["peak_bytes"], frame[1] - frame[0])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], frame[1])
+
+    def finish(self) -> None:
+        """Stop tracing and write the cProfile stats, if requested."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        if self._cprofile is not None and self.pstats_path is not None:
+            self._cprofile.disable()
+            self.pstats_path.parent.mkdir(parents=True, exist_ok=True)
+            self._cprofile.dump_stats(str(self.pstats_path))
+            self._cprofile = None
+
+    def report(self) -> Dict[str, Any]:
+        phases = {
+            name: {
+                "calls": entry["calls"],
+                "wall_sec": round(entry["wall_sec"], 6),
+                "cpu_sec": round(entry["cpu_sec"], 6),
+                **({"peak_bytes": entry["peak_bytes"]} if self.memory else {}),
+            }
+            for name, entry in self.phases.items()
+        }
+        return {
+            "total_wall_sec": round(time.perf_counter() - self._t0, 6),
+            "total_cpu_sec": round(time.process_time() - self._cpu0, 6),
+            "tracemalloc": self.memory,
+            "pstats": None if self.pstats_path is None else str(self.pstats_path),
+            "phases": phases,
+        }
 
-    op_rows: List[Dict[str, Any]] = []
-    piece_rows: List[Dict[str, Any]] = []
-    logs: List[str] = []
-    warnings: List[str] = []
 
-    for batch in batches:
-        prev_piece_end: List[datetime] = []
+def profile_phase(profiler: Optional[PhaseProfiler], name: str) -> Any:
+    """``profiler.phase(name)``, or a no-op context when not profiling."""
+    return nullcontext() if profiler is None else profiler.phase(name)
+
+
+@dataclass
+class ScheduleState:
+    """Resource bookings and messages accumulated while scheduling."""
+
+    machine_cal: Dict[str, OccupancyCalendar] = field(default_factory=dict)
+    operator_cal: Dict[str, OccupancyCalendar] = field(default_factory=dict)
+    logs: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+    piece_check: Optional["PiecePrecedenceCheck"] = None
+    profiler: Optional[PhaseProfiler] = None
+
+    @classmethod
+    def for_settings(
+        cls, settings: Settings, profiler: Optional[PhaseProfiler] = None
+    ) -> "ScheduleState":
+        return cls(
+            operator_cal={op: OccupancyCalendar() for op in settings.shifts},
+            piece_check=PiecePrecedenceCheck(settings.validate_mode),
+            profiler=profiler,
+        )
+
+    def validate(
+        self, op_rows: Sequence[Mapping[str, Any]], settings: Settings
+    ) -> Dict[str, Any]:
+        with profile_phase(self.profiler, "validate_results"):
+            validation = validate_results(
+                op_rows,
+                {op: cal.intervals for op, cal in self.operator_cal.items()},
+                {machine: cal.intervals for machine, cal in self.machine_cal.items()},
+                settings,
+                mode=settings.validate_mode,
+                piece_check=self.piece_check,
+            )
+        validation["stats"]["counters"] = COUNTERS.snapshot()
+        validation["warnings"].extend(self.warnings)
+        validation["logs"] = self.logs
+        return validation
+
+
+@dataclass
+class ScheduledOperation:
+    """One finalized operation and its per-piece plan minutes."""
+
+    record: OperationRecord
+    arrivals: List[int]
+    starts: List[int]
+    ends: List[int]
+    batch_index: int = 0
+
+
+VALIDATE_MODES = ("full", "fast", "off")
+FAST_PIECE_SAMPLES = 64
+
+
+class PiecePrecedenceCheck:
+    """Check that every piece starts op k+1 no earlier than it ended op k.
+
+    Operations are fed in scheduling order (batch by batch, by sequence), so
+    only the previous operation's piece ends are kept. In ``fast`` mode about
+    ``FAST_PIECE_SAMPLES`` pieces per operation are checked (always the first
+    and last); ``off`` checks nothing.
+    """
+
+    def __init__(self, mode: str = "full") -> None:
+        self.mode = mode
+        self.errors: List[str] = []
+        self.checked = 0
+        self._batch: Optional[int] = None
+        self._prev_ends: Sequence[int] = ()
+
+    def add(self, scheduled: ScheduledOperation) -> None:
+        if self.mode == "off":
+            return
+        if scheduled.batch_index == self._batch:
+            self._check(scheduled.record, scheduled.starts)
+        self._batch = scheduled.batch_index
+        self._prev_ends = scheduled.ends
+
+    def _check(self, record: OperationRecord, starts: Sequence[int]) -> None:
+        prev_ends = self._prev_ends
+        count = min(len(prev_ends), len(starts))
+        indexes: Iterable[int] = range(count)
+        if self.mode == "fast" and count > FAST_PIECE_SAMPLES:
+            step = -(-count // FAST_PIECE_SAMPLES)
+            indexes = sorted(set(range(0, count, step)) | {count - 1})
+        for i in indexes:
+            self.checked += 1
+            if starts[i] < prev_ends[i]:
+                self.errors.append(
+                    f"Piece precedence violation for {record.part_number} {record.batch_id} piece {i + 1} op{record.operation_seq}"
+                )
+
+
+def iter_piece_level_schedule(
+    batches: Sequence[BatchSpec],
+    settings: Settings,
+    state: Optional[ScheduleState] = None,
+) -> Iterator[ScheduledOperation]:
+    """Schedule ``batches``, yielding each operation as soon as it is booked.
+
+    Bookings, logs and warnings collect in ``state`` for ``state.validate``.
+    """
+    if state is None:
+        state = ScheduleState.for_settings(settings)
+    COUNTERS.reset()
+    engine = calendar_for(settings)
+    machine_cal = state.machine_cal
+    operator_cal = state.operator_cal
+    logs = state.logs
+    warnings = state.warnings
+    profiler = state.profiler
+
+    for batch_index, batch in enumerate(batches):
+        batch_start = to_minute(batch.start_datetime)
+        due = None if batch.due_datetime is None else to_minute(batch.due_datetime)
+        prev_piece_end: List[int] = []
         for op in sorted(batch.operations, key=lambda x: x.operation_seq):
-            candidate_base = batch.start_datetime
+            candidate_base = batch_start
             if prev_piece_end:
                 candidate_base = max(candidate_base, prev_piece_end[0])
 
@@ -499,40 +1979,48 @@ def run_piece_level_schedule(
                 if not machine_candidates:
                     machine_candidates = [op.machine or "VMC 1"]
 
+            COUNTERS.operations += 1
+            COUNTERS.machine_candidates += len(machine_candidates)
+            if len(machine_candidates) > COUNTERS.machine_candidates_max:
+                COUNTERS.machine_candidates_max = len(machine_candidates)
+
             best = None
             best_payload = None
             best_logs: List[str] = []
 
             for machine in machine_candidates:
                 machine_start = next_machine_free(machine, candidate_base, machine_cal)
-                setup_start, setup_end, operator, setup_segments, setup_logs = (
-                    find_setup_slot(
-                        machine_start,
-                        op.setup_time_min,
-                        machine,
-                        settings,
-                        operator_cal,
-                    )
-                )
-
-                piece_starts: List[datetime] = []
-                piece_ends: List[datetime] = []
-                for i in range(batch.batch_qty):
-                    arrival = prev_piece_end[i] if prev_piece_end else setup_end
-                    prev_same = piece_ends[i - 1] if i > 0 else setup_end
-                    candidate = max(arrival, prev_same, setup_end)
-                    run_start = next_allowed_run_start(candidate, machine, settings)
-                    run_end = add_work_minutes(
-                        run_start,
-                        op.cycle_time_min,
-                        machine,
-                        settings,
-                        mode="run",
+                while True:
+                    with profile_phase(profiler, "setup_search"):
+                        setup_start, setup_end, operator, setup_segments, setup_logs = (
+                            find_setup_slot(
+                                machine_start,
+                                op.setup_time_min,
+                                machine,
+                                settings,
+                                operator_cal,
+                            )
+                        )
+
+                    with profile_phase(profiler, "piece_timing"):
+                        run_cal = engine.run_calendar(machine)
+                        piece_starts, piece_ends = run_cal.place_pieces(
+                            setup_end,
+                            prev_piece_end,
+                            batch.batch_qty,
+                            op.cycle_time_min,
+                        )
+
+                    run_end_batch = piece_ends[-1]
+                    # The booking must fit before the machine's next busy span;
+                    # otherwise retry from the first gap long enough for it.
+                    fit = next_machine_free(
+                        machine, setup_start, machine_cal, run_end_batch - setup_start
                     )
-                    piece_starts.append(run_start)
-                    piece_ends.append(run_end)
+                    if fit == setup_start:
+                        break
+                    machine_start = fit
 
-                run_end_batch = piece_ends[-1]
                 if best is None or run_end_batch < best:
                     best = run_end_batch
                     best_payload = {
@@ -560,59 +2048,63 @@ def run_piece_level_schedule(
             piece_ends = best_payload["piece_ends"]
 
             logs.extend(best_logs)
-            machine_cal.setdefault(machine, []).append(Interval(setup_start, run_end))
-            operator_cal.setdefault(operator, []).extend(setup_segments)
+            machine_cal.setdefault(machine, OccupancyCalendar()).add(
+                Interval(setup_start, run_end)
+            )
+            operator_busy = operator_cal.setdefault(operator, OccupancyCalendar())
+            for segment in setup_segments:
+                operator_busy.add(segment)
 
             due_note = ""
             status = "OK"
-            if batch.due_datetime and run_end > batch.due_datetime:
+            if due is not None and run_end > due:
                 status = "⚠"
-                due_note = f"Due miss by {(run_end - batch.due_datetime)}"
+                due_note = f"Due miss by {timedelta(minutes=run_end - due)}"
                 warnings.append(
-                    f"[DUE] part={batch.part_number} batch={batch.batch_id} op={op.operation_seq} run_end={fmt(run_end)} due={fmt(batch.due_datetime)}"
+                    f"[DUE] part={batch.part_number} batch={batch.batch_id} op={op.operation_seq} run_end={fmt_minute(run_end)} due={fmt_minute(due)}"
                 )
 
-            op_rows.append(
-                {
-                    "PartNumber": batch.part_number,
-                    "Batch_ID": batch.batch_id,
-                    "OperationSeq": op.operation_seq,
-                    "OperationName": op.operation_name,
-                    "Machine": machine,
-                    "Operator": operator,
-                    "SetupStart": fmt(setup_start),
-                    "SetupEnd": fmt(setup_end),
-                    "RunStart": fmt(run_start),
-                    "RunEnd": fmt(run_end),
-                    "Status": status,
-                    "Notes": due_note,
-                }
+            record = OperationRecord(
+                part_number=batch.part_number,
+                batch_id=batch.batch_id,
+                operation_seq=op.operation_seq,
+                operation_name=op.operation_name,
+                machine=machine,
+                operator=operator,
+                setup_start=setup_start,
+                setup_end=setup_end,
+                run_start=run_start,
+                run_end=run_end,
+                status=status,
+                notes=due_note,
             )
-
-            for idx, (ps, pe) in enumerate(zip(piece_starts, piece_ends), start=1):
-                arrival = prev_piece_end[idx - 1] if prev_piece_end else setup_end
-                piece_rows.append(
-                    {
-                        "PartNumber": batch.part_number,
-                        "Batch_ID": batch.batch_id,
-                        "Piece": idx,
-                        "OperationSeq": op.operation_seq,
-                        "OperationName": op.operation_name,
-                        "Machine": machine,
-                        "Operator": operator,
-                        "ArrivalFromPrevOp": fmt(arrival),
-                        "RunStart": fmt(ps),
-                        "RunEnd": fmt(pe),
-                        "WaitMin": int((ps - arrival).total_seconds() // 60),
-                    }
-                )
+            arrivals = prev_piece_end or [setup_end] * len(piece_starts)
+            scheduled = ScheduledOperation(
+                record, arrivals, piece_starts, piece_ends, batch_index
+            )
+            if state.piece_check is not None:
+                state.piece_check.add(scheduled)
+            yield scheduled
 
             prev_piece_end = piece_ends
 
-    event_rows = build_live_event_rows(piece_rows)
-    validation = validate_results(op_rows, operator_cal, machine_cal, settings)
-    validation["warnings"].extend(warnings)
-    validation["logs"] = logs
+
+def run_piece_level_schedule(
+    batches: Sequence[BatchSpec],
+    settings: Settings,
+    profiler: Optional[PhaseProfiler] = None,
+) -> Dict[str, Any]:
+    state = ScheduleState.for_settings(settings, profiler)
+    op_rows: List[OperationRecord] = []
+    piece_rows = PieceTable()
+    with profile_phase(profiler, "schedule"):
+        for scheduled in iter_piece_level_schedule(batches, settings, state):
+            op_rows.append(scheduled.record)
+            piece_rows.add_scheduled(scheduled)
+
+    with profile_phase(profiler, "build_live_event_rows"):
+        event_rows = build_live_event_rows(piece_rows)
+    validation = state.validate(op_rows, settings)
 
     return {
         "operation_rows": op_rows,
@@ -622,84 +2114,155 @@ def run_piece_level_schedule(
     }
 
 
+def overlap_errors(
+    groups: Sequence[Tuple[str, str, Sequence[Interval]]],
+) -> List[str]:
+    """Sweep all resources' intervals in one pass sorted by start.
+
+    ``groups`` holds ``(label, resource, intervals)``. An interval is reported
+    when it starts before the latest end seen so far on its resource, so every
+    interval overlapping any earlier one is flagged, not only adjacent pairs.
+    Errors come out grouped in ``groups`` order, by start within a group.
+    """
+    entries = sorted(
+        (
+            (iv.start, iv.end, group)
+            for group, (_, _, intervals) in enumerate(groups)
+            for iv in intervals
+        ),
+        key=lambda entry: entry[0],
+    )
+    reach: List[Optional[int]] = [None] * len(groups)
+    found: List[List[str]] = [[] for _ in groups]
+    for start, end, group in entries:
+        if end <= start:
+            continue
+        latest = reach[group]
+        if latest is not None and start < latest:
+            label, resource, _ = groups[group]
+            found[group].append(f"{label} overlap: {resource} at {fmt_minute(start)}")
+        if latest is None or end > latest:
+            reach[group] = end
+    return [error for errors in found for error in errors]
+
+
 def validate_results(
-    op_rows: Sequence[Dict[str, Any]],
+    op_rows: Sequence[Mapping[str, Any]],
     operator_cal: Dict[str, List[Interval]],
     machine_cal: Dict[str, List[Interval]],
-    settings: Settings,
+    settings: Optional[Settings],
+    mode: str = "full",
+    piece_check: Optional[PiecePrecedenceCheck] = None,
 ) -> Dict[str, Any]:
     errors: List[str] = []
     warnings: List[str] = []
+    stats: Dict[str, Any] = {
+        "operation_rows": len(op_rows),
+        "machines": len(machine_cal),
+        "operators": len(operator_cal),
+    }
+    if mode != "full":
+        stats["validation_mode"] = mode
+    if mode == "off":
+        warnings.append("Validation skipped (--validate off)")
+        return {
+            "valid": None,
+            "skipped": True,
+            "errors": errors,
+            "warnings": warnings,
+            "stats": stats,
+        }
 
-    for op, intervals in operator_cal.items():
-        sorted_iv = sorted(intervals, key=lambda x: x.start)
-        for i in range(1, len(sorted_iv)):
-            if overlaps(sorted_iv[i - 1], sorted_iv[i]):
-                errors.append(f"Operator overlap: {op} at {fmt(sorted_iv[i].start)}")
-
-    for machine, intervals in machine_cal.items():
-        sorted_iv = sorted(intervals, key=lambda x: x.start)
-        for i in range(1, len(sorted_iv)):
-            if overlaps(sorted_iv[i - 1], sorted_iv[i]):
-                errors.append(
-                    f"Machine overlap: {machine} at {fmt(sorted_iv[i].start)}"
-                )
+    errors.extend(
+        overlap_errors(
+            [("Operator", op, intervals) for op, intervals in operator_cal.items()]
+            + [
+                ("Machine", machine, intervals)
+                for machine, intervals in machine_cal.items()
+            ]
+        )
+    )
 
-    grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+    grouped: Dict[Tuple[str, str], List[Mapping[str, Any]]] = {}
     for row in op_rows:
         grouped.setdefault((row["PartNumber"], row["Batch_ID"]), []).append(row)
 
     for key, rows in grouped.items():
         rows = sorted(rows, key=lambda x: int(x["OperationSeq"]))
         for i in range(1, len(rows)):
-            prev_end = parse_dt(rows[i - 1]["RunEnd"])
-            curr_end = parse_dt(rows[i]["RunEnd"])
+            prev_end = row_minute(rows[i - 1], "RunEnd")
+            curr_end = row_minute(rows[i], "RunEnd")
             if curr_end < prev_end:
                 errors.append(
                     f"RunEnd ordering violation for {key[0]} {key[1]} op{rows[i]['OperationSeq']}"
                 )
 
+    if piece_check is not None:
+        errors.extend(piece_check.errors)
+        stats["piece_checks"] = piece_check.checked
+
     return {
         "valid": not errors,
         "errors": errors,
         "warnings": warnings,
-        "stats": {
-            "operation_rows": len(op_rows),
-            "machines": len(machine_cal),
-            "operators": len(operator_cal),
-        },
+        "stats": stats,
     }
 
 
-def write_csv(path: Path, rows: Sequence[Dict[str, Any]]) -> None:
+def write_csv(path: Path, rows: Iterable[Mapping[str, Any]]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    if not rows:
+    row_iter = iter(rows)
+    first = next(row_iter, None)
+    if first is None:
         path.write_text("", encoding="utf-8")
         return
-    fieldnames = list(rows[0].keys())
+    fieldnames = list(first.keys())
     with path.open("w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(rows)
+        writer.writerow(first)
+        writer.writerows(row_iter)
+
+
+def write_html_rows(
+    path: Path, html_template: str, payload: Iterable[Dict[str, Any]]
+) -> None:
+    """Write ``html_template`` with ``__DATA__`` replaced by the payload JSON.
+
+    The array is written item by item (same bytes as ``json.dumps(list)``), so
+    a streamed payload never has to be held in memory.
+    """
+    head, tail = html_template.split("__DATA__", 1)
+    with path.open("w", encoding="utf-8") as f:
+        f.write(head)
+        f.write("[")
+        for i, item in enumerate(payload):
+            if i:
+                f.write(", ")
+            f.write(json.dumps(item))
+        f.write("]")
+        f.write(tail)
 
 
 def write_html_timeline(
-    path: Path, piece_rows: Sequence[Dict[str, Any]], lane_mode: str
+    path: Path, piece_rows: Iterable[Mapping[str, Any]], lane_mode: str
 ) -> None:
-    payload = []
-    for row in piece_rows:
-        lane = row["Machine"] if lane_mode == "machine" else f"Op {row['OperationSeq']}"
-        payload.append(
-            {
-                "part": row["PartNumber"],
-                "batch": row["Batch_ID"],
-                "piece": int(row["Piece"]),
-                "op": int(row["OperationSeq"]),
-                "lane": lane,
-                "start": row["RunStart"],
-                "end": row["RunEnd"],
-            }
-        )
+    payload = (
+        {
+            "part": row["PartNumber"],
+            "batch": row["Batch_ID"],
+            "piece": int(row["Piece"]),
+            "op": int(row["OperationSeq"]),
+            "lane": (
+                row["Machine"]
+                if lane_mode == "machine"
+                else f"Op {row['OperationSeq']}"
+            ),
+            "start": row["RunStart"],
+            "end": row["RunEnd"],
+        }
+        for row in piece_rows
+    )
 
     html_template = """<!doctype html>
 <html>
@@ -773,26 +2336,24 @@ def write_html_timeline(
 </body>
 </html>
 """
-    html = html_template.replace("__DATA__", json.dumps(payload)).replace(
-        "__LANE_MODE__", lane_mode.title()
+    write_html_rows(
+        path, html_template.replace("__LANE_MODE__", lane_mode.title()), payload
     )
-    path.write_text(html, encoding="utf-8")
 
 
-def write_html_flow_map(path: Path, piece_rows: Sequence[Dict[str, Any]]) -> None:
-    payload = []
-    for row in piece_rows:
-        payload.append(
-            {
-                "part": row["PartNumber"],
-                "batch": row["Batch_ID"],
-                "piece": int(row["Piece"]),
-                "op": int(row["OperationSeq"]),
-                "machine": row["Machine"],
-                "start": row["RunStart"],
-                "end": row["RunEnd"],
-            }
-        )
+def write_html_flow_map(path: Path, piece_rows: Iterable[Mapping[str, Any]]) -> None:
+    payload = (
+        {
+            "part": row["PartNumber"],
+            "batch": row["Batch_ID"],
+            "piece": int(row["Piece"]),
+            "op": int(row["OperationSeq"]),
+            "machine": row["Machine"],
+            "start": row["RunStart"],
+            "end": row["RunEnd"],
+        }
+        for row in piece_rows
+    )
 
     html_template = """<!doctype html>
 <html>
@@ -1020,55 +2581,61 @@ def write_html_flow_map(path: Path, piece_rows: Sequence[Dict[str, Any]]) -> Non
 </html>
 """
 
-    html = html_template.replace("__DATA__", json.dumps(payload))
-    path.write_text(html, encoding="utf-8")
+    write_html_rows(path, html_template, payload)
 
 
 def load_input(
     path: Optional[Path], demo: Optional[str], lane_mode: str
 ) -> Tuple[List[BatchSpec], Settings]:
     if demo:
-        qty = 3 if demo == "batch3" else 250
-        start = parse_dt("2026-02-21 07:00")
-        due = parse_dt("2026-02-22 18:00")
-        batch = BatchSpec(
-            part_number="PN1001",
-            batch_id="B01",
-            batch_qty=qty,
-            start_datetime=start,
-            due_datetime=due,
-            operations=[
-                OperationSpec(
-                    1, "Facing", 70, 18, eligible_machines=["VMC 1", "VMC 2"]
-                ),
-                OperationSpec(
-                    2, "Drill", 70, 10, eligible_machines=["VMC 1", "VMC 2", "VMC 7"]
-                ),
-                OperationSpec(3, "Deburr", 70, 1, eligible_machines=["VMC 3", "VMC 4"]),
-                OperationSpec(4, "Finish", 70, 1, eligible_machines=["VMC 5", "VMC 6"]),
-            ],
-        )
-        settings = Settings(
-            setup_window=parse_window("06:00-22:00"),
-            production_window=parse_window("00:00-23:59"),
-            operators_by_shift={"shift1": ["A", "B"], "shift2": ["C", "D"]},
-            shifts={
-                "A": parse_window("06:00-14:00"),
-                "B": parse_window("06:00-14:00"),
-                "C": parse_window("14:00-22:00"),
-                "D": parse_window("14:00-22:00"),
-            },
-            holidays=[],
-            breakdowns=[],
-            lane_mode=lane_mode,
-            machine_mode="respect_fixed",
-        )
-        return [batch], settings
+        return demo_input(demo, lane_mode)
 
     if path is None:
         raise ValueError("Provide --input or --demo")
 
     raw = json.loads(path.read_text(encoding="utf-8"))
+    return parse_input(raw, lane_mode)
+
+
+def demo_input(demo: str, lane_mode: str) -> Tuple[List[BatchSpec], Settings]:
+    qty = 3 if demo == "batch3" else 250
+    start = parse_dt("2026-02-21 07:00")
+    due = parse_dt("2026-02-22 18:00")
+    batch = BatchSpec(
+        part_number="PN1001",
+        batch_id="B01",
+        batch_qty=qty,
+        start_datetime=start,
+        due_datetime=due,
+        operations=[
+            OperationSpec(1, "Facing", 70, 18, eligible_machines=["VMC 1", "VMC 2"]),
+            OperationSpec(
+                2, "Drill", 70, 10, eligible_machines=["VMC 1", "VMC 2", "VMC 7"]
+            ),
+            OperationSpec(3, "Deburr", 70, 1, eligible_machines=["VMC 3", "VMC 4"]),
+            OperationSpec(4, "Finish", 70, 1, eligible_machines=["VMC 5", "VMC 6"]),
+        ],
+    )
+    settings = Settings(
+        setup_window=compile_window("06:00-22:00"),
+        production_window=compile_window("00:00-23:59"),
+        operators_by_shift={"shift1": ["A", "B"], "shift2": ["C", "D"]},
+        shifts={
+            "A": compile_window("06:00-14:00"),
+            "B": compile_window("06:00-14:00"),
+            "C": compile_window("14:00-22:00"),
+            "D": compile_window("14:00-22:00"),
+        },
+        holidays=[],
+        breakdowns=[],
+        lane_mode=lane_mode,
+        machine_mode="respect_fixed",
+    )
+    return [batch], settings
+
+
+def parse_input(raw: Any, lane_mode: str) -> Tuple[List[BatchSpec], Settings]:
+    """Validate an already-decoded input document (the ``--input`` JSON)."""
     raw = _require_object(raw, "input root")
 
     holidays_raw = _require_list(raw.get("holidays", []), "holidays")
@@ -1105,16 +2672,28 @@ def load_input(
                 f"Invalid breakdown interval in {context}: end must be after start"
             )
 
-        breakdowns.append(Breakdown(machine=machine_name, start=start_dt, end=end_dt))
+        breakdowns.append(
+            Breakdown(
+                machine=machine_name, start=to_minute(start_dt), end=to_minute(end_dt)
+            )
+        )
+
+    validate_mode = raw.get("validate_mode", "full")
+    if validate_mode not in VALIDATE_MODES:
+        raise InputValidationError(
+            f"Invalid validate_mode: expected one of {', '.join(VALIDATE_MODES)}"
+        )
 
     settings = Settings(
-        setup_window=parse_window(raw.get("setup_window", "06:00-22:00")),
-        production_window=parse_window(raw.get("production_window", "00:00-23:59")),
+        setup_window=compile_window(raw.get("setup_window", "06:00-22:00")),
+        production_window=compile_window(
+            raw.get("production_window", "00:00-23:59")
+        ),
         operators_by_shift=raw.get(
             "operators_by_shift", {"shift1": ["A", "B"], "shift2": ["C", "D"]}
         ),
         shifts={
-            key: parse_window(value)
+            key: compile_window(value)
             for key, value in raw.get(
                 "shifts",
                 {
@@ -1127,8 +2706,12 @@ def load_input(
         },
         holidays=holidays,
         breakdowns=breakdowns,
+        holiday_index=HolidayIndex.from_datetimes(holidays),
+        breakdown_index=BreakdownIndex.from_breakdowns(breakdowns),
         lane_mode=lane_mode,
         machine_mode=raw.get("machine_mode", "respect_fixed"),
+        calendar_backend=raw.get("calendar_backend", "segments"),
+        validate_mode=validate_mode,
     )
 
     batches_raw = _require_key(raw, "batches", "input root")
@@ -1249,7 +2832,468 @@ def load_input(
     return batches, settings
 
 
-def main() -> None:
+OUTPUT_FILES = (
+    "operation_summary.csv",
+    "piece_timeline.csv",
+    "piece_live_events.csv",
+    "piece_flow.html",
+    "piece_flow_map.html",
+)
+
+
+def _read_csv_rows(path: Path) -> Iterator[Dict[str, str]]:
+    with path.open(newline="", encoding="utf-8") as f:
+        yield from csv.DictReader(f)
+
+
+def write_outputs(
+    results: Dict[str, Any],
+    out_dir: Path,
+    lane_mode: str,
+    profiler: Optional[PhaseProfiler] = None,
+) -> None:
+    """Write ``OUTPUT_FILES`` and validation_report.json for an in-memory run.
+
+    With a ``profiler`` each file is its own ``write:<name>`` phase; the live
+    events are merged lazily, so their cost lands in the events CSV phase.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pieces = results["piece_rows"]
+    writers = (
+        ("operation_summary.csv", write_csv, (results["operation_rows"],)),
+        ("piece_timeline.csv", write_csv, (pieces,)),
+        ("piece_live_events.csv", write_csv, (results["event_rows"],)),
+        ("piece_flow.html", write_html_timeline, (pieces, lane_mode)),
+        ("piece_flow_map.html", write_html_flow_map, (pieces,)),
+    )
+    for name, writer, writer_args in writers:
+        with profile_phase(profiler, f"write:{name}"):
+            writer(out_dir / name, *writer_args)
+    write_validation_report(results["validation"], out_dir, profiler)
+
+
+def write_validation_report(
+    validation: Dict[str, Any],
+    out_dir: Path,
+    profiler: Optional[PhaseProfiler] = None,
+) -> None:
+    if profiler is not None:
+        validation["timings"] = profiler.report()
+    (out_dir / "validation_report.json").write_text(
+        json.dumps(validation, indent=2), encoding="utf-8"
+    )
+
+
+def stream_piece_level_schedule(
+    batches: Sequence[BatchSpec],
+    settings: Settings,
+    out_dir: Path,
+    lane_mode: str,
+    profiler: Optional[PhaseProfiler] = None,
+) -> Dict[str, Any]:
+    """Schedule and write the CSV and HTML outputs incrementally (``--stream``).
+
+    Operation and piece rows go to their CSVs as each operation is finalized,
+    events are spilled per operation and k-way merged into the events CSV, and
+    the HTML views are fed back from the piece CSV. Only one batch's piece
+    arrays and the per-operation records stay in memory. Files are written
+    under a ``.partial`` suffix and renamed once everything succeeded.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    partial = {name: out_dir / f"{name}.partial" for name in OUTPUT_FILES}
+    state = ScheduleState.for_settings(settings, profiler)
+    op_rows: List[OperationRecord] = []
+    events = EventSpill()
+    try:
+        with partial["operation_summary.csv"].open(
+            "w", newline="", encoding="utf-8"
+        ) as op_file, partial["piece_timeline.csv"].open(
+            "w", newline="", encoding="utf-8"
+        ) as piece_file, profile_phase(profiler, "schedule"):
+            op_writer = csv.writer(op_file)
+            piece_writer = csv.writer(piece_file)
+            wrote_piece_header = False
+            for scheduled in iter_piece_level_schedule(batches, settings, state):
+                record = scheduled.record
+                if not op_rows:
+                    op_writer.writerow(OPERATION_FIELDS)
+                op_writer.writerow(record.values())
+                op_rows.append(record)
+
+                if scheduled.starts and not wrote_piece_header:
+                    piece_writer.writerow(PIECE_FIELDS)
+                    wrote_piece_header = True
+                for piece, (arrival, start, end) in enumerate(
+                    zip(scheduled.arrivals, scheduled.starts, scheduled.ends), start=1
+                ):
+                    piece_writer.writerow(
+                        piece_row(
+                            record.part_number,
+                            record.batch_id,
+                            piece,
+                            record.operation_seq,
+                            record.operation_name,
+                            record.machine,
+                            record.operator,
+                            arrival,
+                            start,
+                            end,
+                        ).values()
+                    )
+                events.add_operation(scheduled)
+
+        with partial["piece_live_events.csv"].open(
+            "w", newline="", encoding="utf-8"
+        ) as event_file, profile_phase(profiler, "write:piece_live_events.csv"):
+            event_writer = csv.writer(event_file)
+            if len(events):
+                event_writer.writerow(EVENT_FIELDS)
+            for row in events:
+                event_writer.writerow(row.values())
+
+        piece_csv = partial["piece_timeline.csv"]
+        with profile_phase(profiler, "write:piece_flow.html"):
+            write_html_timeline(
+                partial["piece_flow.html"], _read_csv_rows(piece_csv), lane_mode
+            )
+        with profile_phase(profiler, "write:piece_flow_map.html"):
+            write_html_flow_map(
+                partial["piece_flow_map.html"], _read_csv_rows(piece_csv)
+            )
+
+        validation = state.validate(op_rows, settings)
+        for name, path in partial.items():
+            os.replace(path, out_dir / name)
+    except BaseException:
+        events.close()
+        for path in partial.values():
+            path.unlink(missing_ok=True)
+        raise
+
+    return {"operation_rows": op_rows, "event_rows": events, "validation": validation}
+
+
+ENGINE_VERSION = "piece-level-5"
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "piece_level_verifier"
+)
+CACHE_MAX_ENTRIES = 64
+CACHED_FILES = OUTPUT_FILES + ("validation_report.json",)
+
+
+def _cache_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return fmt(value)
+    if isinstance(value, TimeWindow):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return [_cache_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _cache_value(item) for key, item in value.items()}
+    if hasattr(value, "__dataclass_fields__"):
+        return {
+            name: _cache_value(getattr(value, name))
+            for name, spec in value.__dataclass_fields__.items()
+            if spec.repr
+        }
+    return value
+
+
+def schedule_cache_key(batches: Sequence[BatchSpec], settings: Settings) -> str:
+    """Hash of the normalized schedule input, independent of JSON layout.
+
+    Derived indexes and the calendar engine are left out (``repr=False``);
+    ``ENGINE_VERSION`` must be bumped whenever scheduling output changes.
+    """
+    payload = {
+        "engine": ENGINE_VERSION,
+        "batches": _cache_value(list(batches)),
+        "settings": _cache_value(settings),
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def calendar_cache_key(settings: Settings) -> str:
+    """Hash of the settings a ``CalendarEngine`` is built from.
+
+    Plans with equal keys can share one engine: its calendars depend only on
+    these windows, holidays, breakdowns and the backend.
+    """
+    payload = {
+        name: _cache_value(getattr(settings, name))
+        for name in (
+            "setup_window",
+            "production_window",
+            "shifts",
+            "holidays",
+            "breakdowns",
+            "calendar_backend",
+        )
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ScheduleCache:
+    """On-disk cache of finished output folders, keyed by input hash.
+
+    Each entry is a directory holding ``CACHED_FILES``; its mtime is bumped on
+    every hit and the least recently used entries are pruned past
+    ``max_entries``. Entries are published with an atomic rename.
+    """
+
+    def __init__(self, root: Path, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.root = root
+        self.max_entries = max_entries
+
+    def restore(self, key: str, out_dir: Path) -> bool:
+        entry = self.root / key
+        if not all((entry / name).is_file() for name in CACHED_FILES):
+            return False
+        out_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for name in CACHED_FILES:
+                shutil.copyfile(entry / name, out_dir / name)
+            os.utime(entry)
+        except OSError:  # evicted by a concurrent run mid-copy
+            return False
+        return True
+
+    def store(self, key: str, out_dir: Path) -> None:
+        entry = self.root / key
+        if entry.exists():
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f".{key[:12]}-", dir=self.root))
+        try:
+            for name in CACHED_FILES:
+                shutil.copyfile(out_dir / name, staging / name)
+            os.replace(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        self.prune()
+
+    def prune(self) -> None:
+        entries: List[Tuple[float, Path]] = []
+        for path in self.root.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:  # already pruned by a concurrent run
+                continue
+        entries.sort()
+        for _, path in entries[: max(0, len(entries) - self.max_entries)]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def apply_cli_overrides(settings: Settings, args: argparse.Namespace) -> None:
+    if args.machine_mode is not None:
+        settings.machine_mode = args.machine_mode
+    if args.calendar_backend is not None:
+        settings.calendar_backend = args.calendar_backend
+    if args.validate is not None:
+        settings.validate_mode = args.validate
+
+
+def schedule_to_dir(
+    batches: Sequence[BatchSpec],
+    settings: Settings,
+    out_dir: Path,
+    args: argparse.Namespace,
+    profiler: Optional[PhaseProfiler] = None,
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Schedule and write every artifact into ``out_dir``.
+
+    Returns the results and, when they were restored from the result cache,
+    the cache key (``None`` after a fresh run). The results always hold
+    ``operation_rows`` (a list), ``piece_rows`` and ``event_rows`` (iterables
+    of row mappings) and ``validation``; rows restored from the cache or
+    written by ``--stream`` are read back from the CSVs, so their values are
+    strings. The cache is only used with
+    ``--cache`` or ``--cache-dir``; profiled runs bypass it because a restored
+    report would carry another run's timings.
+    """
+    validation_path = out_dir / "validation_report.json"
+    cache = None
+    use_cache = args.cache or args.cache_dir is not None
+    if use_cache and not args.no_cache and profiler is None:
+        cache = ScheduleCache(
+            args.cache_dir or CACHE_DIR, max(1, args.cache_max_entries)
+        )
+        cache_key = schedule_cache_key(batches, settings)
+        if cache.restore(cache_key, out_dir):
+            results = {
+                "operation_rows": list(
+                    _read_csv_rows(out_dir / "operation_summary.csv")
+                ),
+                "piece_rows": _read_csv_rows(out_dir / "piece_timeline.csv"),
+                "event_rows": _read_csv_rows(out_dir / "piece_live_events.csv"),
+                "validation": json.loads(validation_path.read_text(encoding="utf-8")),
+            }
+            return results, cache_key
+
+    if args.stream:
+        results = stream_piece_level_schedule(
+            batches, settings, out_dir, args.lane_mode, profiler
+        )
+        write_validation_report(results["validation"], out_dir, profiler)
+        results["piece_rows"] = _read_csv_rows(out_dir / "piece_timeline.csv")
+    else:
+        results = run_piece_level_schedule(batches, settings, profiler)
+        write_outputs(results, out_dir, args.lane_mode, profiler)
+    if cache is not None:
+        cache.store(cache_key, out_dir)
+    return results, None
+
+
+def write_failure_diagnostic(out_dir: Path) -> Optional[Path]:
+    """Record the exception being handled as failure_diagnostic.json."""
+    try:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        lines = traceback.format_exc().strip().splitlines()
+        diagnostic = {
+            "error_class": lines[-1].split(":", 1)[0],
+            "error": lines[-1],
+            "traceback": traceback.format_exc().splitlines(),
+        }
+        path = out_dir / "failure_diagnostic.json"
+        path.write_text(json.dumps(diagnostic, indent=2), encoding="utf-8")
+        return path
+    except Exception:
+        return None
+
+
+def resolve_batch_inputs(spec: str) -> List[Path]:
+    """Expand ``--batch-inputs``: a directory, a glob or a manifest file.
+
+    A directory yields its ``*.json`` files; a ``.json`` manifest holds a list
+    of paths (or ``{"inputs": [...]}``) and a ``.txt`` manifest one path per
+    line, both relative to the manifest. Order is sorted for directories and
+    globs and preserved for manifests.
+    """
+    path = Path(spec)
+    if path.is_dir():
+        inputs = sorted(path.glob("*.json"))
+    elif path.is_file():
+        text = path.read_text(encoding="utf-8")
+        if path.suffix == ".json":
+            raw = json.loads(text)
+            if isinstance(raw, dict):
+                raw = _require_key(raw, "inputs", "batch manifest")
+            entries = [str(item) for item in _require_list(raw, "batch manifest")]
+        else:
+            entries = [
+                line.strip()
+                for line in text.splitlines()
+                if line.strip() and not line.strip().startswith("#")
+            ]
+        inputs = [path.parent / entry for entry in entries]
+    else:
+        inputs = sorted(Path(match) for match in glob.glob(spec))
+    if not inputs:
+        raise ValueError(f"No input files found for --batch-inputs {spec!r}")
+    return inputs
+
+
+def batch_output_dirs(inputs: Sequence[Path], out_dir: Path) -> List[Path]:
+    """One subfolder per input, named after its stem and made unique."""
+    seen: Dict[str, int] = {}
+    dirs: List[Path] = []
+    for input_path in inputs:
+        stem = input_path.stem
+        seen[stem] = seen.get(stem, 0) + 1
+        name = stem if seen[stem] == 1 else f"{stem}_{seen[stem]}"
+        dirs.append(out_dir / name)
+    return dirs
+
+
+def run_batch_input(
+    input_path: Path, out_dir: Path, args: argparse.Namespace
+) -> Dict[str, Any]:
+    """Schedule one batch-mode input; failures are reported, not raised."""
+    t0 = time.perf_counter()
+    entry: Dict[str, Any] = {"input": str(input_path), "out_dir": str(out_dir)}
+    profiler = None
+    if args.profile is not None:
+        profiler = PhaseProfiler(args.profile == "memory")
+    try:
+        with profile_phase(profiler, "load_input"):
+            batches, settings = load_input(input_path, None, args.lane_mode)
+        apply_cli_overrides(settings, args)
+        results, cache_key = schedule_to_dir(
+            batches, settings, out_dir, args, profiler
+        )
+        validation = results["validation"]
+        entry.update(
+            status="ok",
+            valid=validation["valid"],
+            errors=len(validation["errors"]),
+            warnings=len(validation["warnings"]),
+            cache_hit=cache_key is not None,
+        )
+    except Exception:
+        write_failure_diagnostic(out_dir)
+        entry.update(
+            status="error",
+            valid=False,
+            error=traceback.format_exc().strip().splitlines()[-1],
+        )
+    finally:
+        if profiler is not None:
+            profiler.finish()
+    entry["elapsed_sec"] = round(time.perf_counter() - t0, 4)
+    return entry
+
+
+def run_batch(args: argparse.Namespace) -> Dict[str, Any]:
+    """Schedule every ``--batch-inputs`` file, fanning out over ``--jobs``."""
+    t0 = time.perf_counter()
+    inputs = resolve_batch_inputs(args.batch_inputs)
+    out_dirs = batch_output_dirs(inputs, args.out_dir)
+    jobs = max(1, min(args.jobs, len(inputs)))
+    if jobs == 1:
+        entries = [run_batch_input(*task, args) for task in zip(inputs, out_dirs)]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            entries = list(
+                pool.map(run_batch_input, inputs, out_dirs, [args] * len(inputs))
+            )
+    for entry in entries:
+        ok = entry["status"] == "ok" and entry["valid"] is not False
+        label = "OK" if ok else "WARN"
+        print(
+            f"[{label}] {entry['input']} -> {entry['out_dir']} ({entry['status']}, {entry['elapsed_sec']:.2f}s)"
+        )
+
+    summary = {
+        "jobs": jobs,
+        "inputs": entries,
+        "total": len(entries),
+        "failed": sum(1 for entry in entries if entry["status"] != "ok"),
+        "invalid": sum(
+            1
+            for entry in entries
+            if entry["status"] == "ok" and entry["valid"] is False
+        ),
+        "elapsed_sec": round(time.perf_counter() - t0, 4),
+    }
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    (args.out_dir / "batch_summary.json").write_text(
+        json.dumps(summary, indent=2), encoding="utf-8"
+    )
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """CLI entry point; ``argv`` defaults to ``sys.argv[1:]``.
+
+    Returns the schedule results (or the batch summary) so callers such as
+    the CHK runners can drive the verifier in-process.
+    """
     parser = argparse.ArgumentParser(description="Piece-level scheduler verifier")
     parser.add_argument("--input", type=Path, help="Input JSON file")
     parser.add_argument(
@@ -1296,38 +3340,115 @@ def main() -> None:
         default=None,
         help="Machine selection mode: respect fixed machine on each operation, or optimize across candidates",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--calendar-backend",
+        choices=list(CALENDAR_BACKENDS),
+        default=None,
+        help="Run-calendar backend: sorted segments, or NumPy minute masks for very large plans",
+    )
+    parser.add_argument(
+        "--validate",
+        choices=list(VALIDATE_MODES),
+        default=None,
+        help="Validation depth: full, fast (sampled per-piece precedence) or off",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write outputs incrementally while scheduling (bounded memory for long plans)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help=f"Reuse and store finished outputs in the result cache (default folder: {CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always reschedule; overrides --cache and --cache-dir",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Result cache folder (keyed by a hash of the normalized input); implies --cache",
+    )
+    parser.add_argument(
+        "--cache-max-entries",
+        type=int,
+        default=CACHE_MAX_ENTRIES,
+        help="Least recently used cache entries beyond this count are evicted",
+    )
+    parser.add_argument(
+        "--batch-inputs",
+        type=str,
+        default=None,
+        help="Directory, glob or manifest (.json list / .txt lines) of input files; each is scheduled into its own subfolder of --out-dir",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for --batch-inputs",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="memory",
+        choices=["time", "memory"],
+        default=None,
+        help="Record per-phase wall/CPU time ('time') plus tracemalloc peaks ('memory', the default; several times slower) under 'timings' in validation_report.json. Bypasses the result cache",
+    )
+    parser.add_argument(
+        "--profile-pstats",
+        type=Path,
+        default=None,
+        help="Also dump cProfile stats of the whole run to this .pstats file (implies --profile time)",
+    )
+    args = parser.parse_args(argv)
     out_dir = args.out_dir
+    if args.profile_pstats is not None and args.profile is None:
+        args.profile = "time"
 
-    try:
-        batches, settings = load_input(args.input, args.demo, args.lane_mode)
-        if args.machine_mode is not None:
-            settings.machine_mode = args.machine_mode
-        results = run_piece_level_schedule(batches, settings)
+    if args.batch_inputs is not None:
+        if args.input is not None or args.demo is not None or args.live:
+            parser.error(
+                "--batch-inputs cannot be combined with --input, --demo or --live"
+            )
+        if args.profile_pstats is not None:
+            parser.error("--profile-pstats cannot be combined with --batch-inputs")
+        summary = run_batch(args)
+        print(f"[OK] batch summary:     {out_dir / 'batch_summary.json'}")
+        if summary["failed"]:
+            print(
+                f"[WARN] {summary['failed']} input(s) failed. Check batch_summary.json"
+            )
+            raise SystemExit(1)
+        return summary
 
-        out_dir.mkdir(parents=True, exist_ok=True)
-        op_path = out_dir / "operation_summary.csv"
-        piece_path = out_dir / "piece_timeline.csv"
-        live_path = out_dir / "piece_live_events.csv"
-        validation_path = out_dir / "validation_report.json"
-        html_path = out_dir / "piece_flow.html"
-        flow_map_path = out_dir / "piece_flow_map.html"
-
-        write_csv(op_path, results["operation_rows"])
-        write_csv(piece_path, results["piece_rows"])
-        write_csv(live_path, results["event_rows"])
-        validation_path.write_text(
-            json.dumps(results["validation"], indent=2), encoding="utf-8"
+    profiler = None
+    if args.profile is not None:
+        profiler = PhaseProfiler(args.profile == "memory", args.profile_pstats)
+    try:
+        with profile_phase(profiler, "load_input"):
+            batches, settings = load_input(args.input, args.demo, args.lane_mode)
+        apply_cli_overrides(settings, args)
+        results, cache_key = schedule_to_dir(
+            batches, settings, out_dir, args, profiler
         )
-        write_html_timeline(html_path, results["piece_rows"], args.lane_mode)
-        write_html_flow_map(flow_map_path, results["piece_rows"])
-
-        print(f"[OK] operation summary: {op_path}")
-        print(f"[OK] piece timeline:    {piece_path}")
-        print(f"[OK] live events:       {live_path}")
-        print(f"[OK] validation:        {validation_path}")
-        print(f"[OK] visual timeline:   {html_path}")
-        print(f"[OK] visual flow map:   {flow_map_path}")
+        if profiler is not None:
+            profiler.finish()
+        if cache_key is not None:
+            print(f"[OK] cache hit:         {cache_key[:16]}")
+
+        print(f"[OK] operation summary: {out_dir / 'operation_summary.csv'}")
+        print(f"[OK] piece timeline:    {out_dir / 'piece_timeline.csv'}")
+        print(f"[OK] live events:       {out_dir / 'piece_live_events.csv'}")
+        print(f"[OK] validation:        {out_dir / 'validation_report.json'}")
+        print(f"[OK] visual timeline:   {out_dir / 'piece_flow.html'}")
+        print(f"[OK] visual flow map:   {out_dir / 'piece_flow_map.html'}")
+        if args.profile_pstats is not None:
+            print(f"[OK] profile stats:     {args.profile_pstats}")
 
         if args.live:
             replay_live_events(
@@ -1338,25 +3459,17 @@ def main() -> None:
                 machine_filter=parse_machine_filter(args.live_machines),
             )
 
-        if not results["validation"]["valid"]:
+        if results["validation"]["valid"] is False:
             print("[WARN] Validation failed. Check validation_report.json")
+        elif results["validation"]["valid"] is None:
+            print("[WARN] Validation skipped (--validate off)")
+        return results
     except Exception:
-        try:
-            out_dir.mkdir(parents=True, exist_ok=True)
-            diagnostic = {
-                "error_class": traceback.format_exc()
-                .strip()
-                .splitlines()[-1]
-                .split(":", 1)[0],
-                "error": traceback.format_exc().strip().splitlines()[-1],
-                "traceback": traceback.format_exc().splitlines(),
-            }
-            (out_dir / "failure_diagnostic.json").write_text(
-                json.dumps(diagnostic, indent=2), encoding="utf-8"
-            )
-            print(f"[WARN] failure diagnostic: {out_dir / 'failure_diagnostic.json'}")
-        except Exception:
-            pass
+        if profiler is not None:
+            profiler.finish()
+        diagnostic_path = write_failure_diagnostic(out_dir)
+        if diagnostic_path is not None:
+            print(f"[WARN] failure diagnostic: {diagnostic_path}")
         raise
 
 
@@ -1,9 +1,40 @@
 import csv
 import json
 import subprocess
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+for path in (REPO_ROOT, SCRIPTS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from scripts import piece_level_verifier as plv
+
+
+def _calendar_settings() -> plv.Settings:
+    return plv.Settings(
+        setup_window=plv.compile_window("22:00-02:00"),
+        production_window=plv.compile_window("21:00-05:30"),
+        operators_by_shift={"shift1": ["A"]},
+        shifts={"A": plv.compile_window("00:00-23:59")},
+        holidays=[
+            plv.parse_dt("2026-02-24 00:00"),
+            plv.parse_dt("2026-02-25 09:00"),
+        ],
+        breakdowns=[
+            plv.Breakdown(
+                "VMC 1",
+                plv.to_minute(plv.parse_dt("2026-02-22 23:10")),
+                plv.to_minute(plv.parse_dt("2026-02-23 01:40")),
+            )
+        ],
+    )
+
 
 def test_demo_batch3_runs(tmp_path: Path):
     out = tmp_path / "out"
@@ -15,6 +46,7 @@ def test_demo_batch3_runs(tmp_path: Path):
             "batch3",
             "--out-dir",
             str(out),
+            "--no-cache",
         ],
         check=False,
         capture_output=True,
@@ -43,6 +75,7 @@ def test_demo_batch3_live_replay_runs(tmp_path: Path):
             "batch3",
             "--out-dir",
             str(out),
+            "--no-cache",
             "--live",
             "--live-delay",
             "0",
@@ -173,3 +206,903 @@ def test_setup_can_pause_across_unavailable_windows(tmp_path: Path):
     setup_start = datetime.strptime(rows[0]["SetupStart"], "%Y-%m-%d %H:%M")
     setup_end = datetime.strptime(rows[0]["SetupEnd"], "%Y-%m-%d %H:%M")
     assert setup_end - setup_start > timedelta(minutes=180)
+
+
+def test_calendar_engine_matches_minute_stepping():
+    settings = _calendar_settings()
+
+    def stepped(start: int, minutes: int, mode: str) -> int:
+        cursor = start
+        remaining = minutes
+        while remaining > 0:
+            if mode == "setup":
+                allowed = plv.is_setup_minute_allowed(cursor, "VMC 1", "A", settings)
+            else:
+                allowed = plv.is_run_minute_allowed(cursor, "VMC 1", settings)
+            if allowed:
+                remaining -= 1
+            cursor += 1
+        return cursor
+
+    base = plv.to_minute(plv.parse_dt("2026-02-22 18:00"))
+    for offset in range(0, 3 * 24 * 60, 131):
+        start = base + offset
+        for minutes in (1, 45, 400):
+            for mode in ("run", "setup"):
+                expected = stepped(start, minutes, mode)
+                actual = plv.add_work_minutes(
+                    start, minutes, "VMC 1", settings, mode=mode, operator="A"
+                )
+                assert actual == expected, (start, minutes, mode)
+
+        cursor = start
+        while not plv.is_run_minute_allowed(cursor, "VMC 1", settings):
+            cursor += 1
+        assert plv.next_allowed_run_start(start, "VMC 1", settings) == cursor
+
+
+def test_compiled_window_handles_overnight_bounds():
+    window = plv.compile_window("22:00-02:00")
+    assert window.overnight
+    assert str(window) == "22:00-02:00"
+    assert window.daily_spans() == [(0, 120), (1320, 1440)]
+    assert window.contains(plv.parse_dt("2026-02-22 23:30"))
+    assert window.contains(plv.parse_dt("2026-02-23 01:59"))
+    assert not window.contains(plv.parse_dt("2026-02-23 02:00"))
+    assert plv.shift_contains_interval(
+        plv.to_minute(plv.parse_dt("2026-02-22 22:30")),
+        plv.to_minute(plv.parse_dt("2026-02-23 01:00")),
+        window,
+    )
+
+
+def test_holiday_index_merges_ranges_and_answers_overlaps():
+    raw = ("2026-03-02 00:00", "2026-03-01 00:00", "2026-03-05 08:00")
+    index = plv.HolidayIndex.from_datetimes([plv.parse_dt(d) for d in raw])
+    first = plv.to_minute(plv.parse_dt("2026-03-01 00:00")) // plv.MINUTES_PER_DAY
+    assert index.ranges() == [(first, first + 2), (first + 4, first + 5)]
+    assert index.next_working_day(first) == first + 2
+    assert index.contains(plv.parse_dt("2026-03-05 23:59"))
+    assert not index.contains(plv.parse_dt("2026-03-03 12:00"))
+
+    def hits(start: str, end: str) -> bool:
+        return index.overlaps(
+            plv.to_minute(plv.parse_dt(start)), plv.to_minute(plv.parse_dt(end))
+        )
+
+    assert hits("2026-02-28 22:00", "2026-03-01 00:30")
+    assert not hits("2026-02-28 22:00", "2026-03-01 00:00")
+    assert not hits("2026-03-03 00:00", "2026-03-05 00:00")
+    assert hits("2026-03-04 12:00", "2026-03-06 00:00")
+
+
+def test_breakdown_index_merges_and_jumps_per_machine():
+    def bd(machine: str, start: str, end: str) -> plv.Breakdown:
+        start_min = plv.to_minute(plv.parse_dt(start))
+        return plv.Breakdown(machine, start_min, plv.to_minute(plv.parse_dt(end)))
+
+    index = plv.BreakdownIndex.from_breakdowns(
+        [
+            bd("VMC 1", "2026-02-22 10:00", "2026-02-22 11:00"),
+            bd("VMC 2", "2026-02-22 09:00", "2026-02-22 12:00"),
+            bd("VMC 1", "2026-02-22 07:00", "2026-02-22 08:00"),
+            bd("VMC 1", "2026-02-22 10:30", "2026-02-22 12:00"),
+        ]
+    )
+
+    def m(text: str) -> int:
+        return plv.to_minute(plv.parse_dt(text))
+
+    assert index.spans("VMC 1") == [
+        (m("2026-02-22 07:00"), m("2026-02-22 08:00")),
+        (m("2026-02-22 10:00"), m("2026-02-22 12:00")),
+    ]
+    assert index.blocked_at("VMC 1", m("2026-02-22 11:59"))
+    assert not index.blocked_at("VMC 1", m("2026-02-22 08:00"))
+    assert not index.blocked_at("VMC 3", m("2026-02-22 10:00"))
+    with pytest.raises(ValueError):
+        index.overlapping("VMC 1", m("2026-02-22 07:30"), m("2026-02-22 10:01"))
+
+
+def test_unmerged_breakdown_index_matches_linear_scan():
+    import random
+
+    rng = random.Random(11)
+    intervals = []
+    for _ in range(300):
+        start = rng.randrange(0, 2000)
+        # Some rules are inverted (end before start) or empty.
+        end = start + rng.randrange(-20, 90)
+        intervals.append((f"VMC {rng.randrange(3)}", start, end))
+    index = plv.BreakdownIndex(intervals, merge=False)
+    assert len(index) == len(intervals)
+    for _ in range(500):
+        machine = f"VMC {rng.randrange(4)}"
+        start = rng.randrange(-50, 2100)
+        end = start + rng.randrange(0, 120)
+        expected = [
+            pos
+            for pos, (m, b_start, b_end) in enumerate(intervals)
+            if m == machine and start < b_end and b_start < end
+        ]
+        assert index.overlapping(machine, start, end) == expected
+        blocked = any(
+            m == machine and b_start <= start < b_end for m, b_start, b_end in intervals
+        )
+        assert index.blocked_at(machine, start) == blocked
+
+
+def test_occupancy_calendar_matches_linear_scan():
+    import random
+
+    rng = random.Random(7)
+    base = plv.to_minute(plv.parse_dt("2026-02-22 06:00"))
+    cal = plv.OccupancyCalendar()
+    intervals = []
+    for _ in range(60):
+        start = base + rng.randrange(0, 5000)
+        end = start + rng.randrange(1, 240)
+        intervals.append(plv.Interval(start, end))
+        cal.add(plv.Interval(start, end))
+
+    spans = cal.spans()
+    assert all(a[1] < b[0] for a, b in zip(spans, spans[1:]))
+    assert len(cal.intervals) == 60
+
+    for offset in range(0, 5400, 37):
+        cursor = base + offset
+        expected = cursor
+        while any(iv.start <= expected < iv.end for iv in intervals):
+            expected = next(iv.end for iv in intervals if iv.start <= expected < iv.end)
+        assert plv.next_machine_free("VMC 1", cursor, {"VMC 1": cal}) == expected
+
+        free_at, free_len = cal.free_gap(cursor)
+        assert free_at == expected
+        if free_len is not None:
+            busy_at = free_at + free_len
+            assert any(iv.start == busy_at for iv in intervals)
+            assert plv.operator_busy_minute("A", busy_at, {"A": cal})
+        assert not plv.operator_busy_minute("A", expected, {"A": cal})
+
+        gap = cal.earliest_gap(cursor, 45)
+        assert gap >= cursor
+        assert not any(iv.start < gap + 45 and gap < iv.end for iv in intervals)
+
+
+def test_machine_search_skips_gaps_too_short_for_the_run():
+    from scripts import piece_level_bench as bench
+
+    # Later batches start earlier on machines an earlier batch already booked
+    # further out; a run must not be squeezed into the gap in front of them.
+    raw = bench.synthetic_input(bench.BenchCase(457, 100, 5, 4, calendar=False))
+    batches, settings = plv.parse_input(raw, "machine")
+    results = plv.run_piece_level_schedule(batches, settings)
+    assert results["validation"]["valid"] is True
+    counters = results["validation"]["stats"]["counters"]
+    assert counters["setup_searches"] > counters["machine_candidates"]
+
+    booked = {}
+    for row in results["operation_rows"]:
+        span = (row["SetupStart"], row["RunEnd"])
+        booked.setdefault(row["Machine"], []).append(span)
+    for spans in booked.values():
+        spans.sort()
+        assert all(prev[1] <= curr[0] for prev, curr in zip(spans, spans[1:]))
+
+
+def test_setup_slot_search_matches_exhaustive_operator_scan():
+    import random
+
+    rng = random.Random(11)
+    operators = ["A", "B", "C", "D", "E"]
+    settings = plv.Settings(
+        setup_window=plv.compile_window("06:00-22:00"),
+        production_window=plv.compile_window("00:00-23:59"),
+        operators_by_shift={"shift1": ["C", "A", "B"], "shift2": ["E", "D", "A"]},
+        shifts={
+            "A": plv.compile_window("06:00-14:00"),
+            "B": plv.compile_window("06:00-14:00"),
+            "C": plv.compile_window("10:00-18:00"),
+            "D": plv.compile_window("14:00-22:00"),
+            "E": plv.compile_window("14:00-22:00"),
+        },
+        holidays=[],
+        breakdowns=[],
+    )
+    base = plv.to_minute(plv.parse_dt("2026-02-22 06:00"))
+
+    for _ in range(25):
+        operator_cal = {op: plv.OccupancyCalendar() for op in operators}
+        for op in operators:
+            for _ in range(rng.randrange(0, 6)):
+                start = base + rng.randrange(0, 3000)
+                end = start + rng.randrange(10, 300)
+                operator_cal[op].add(plv.Interval(start, end))
+        candidate = base + rng.randrange(0, 1440)
+        duration = rng.randrange(5, 400)
+
+        expected = None
+        for op in ["C", "A", "B", "E", "D"]:
+            single = plv.Settings(
+                setup_window=settings.setup_window,
+                production_window=settings.production_window,
+                operators_by_shift={"only": [op]},
+                shifts=settings.shifts,
+                holidays=[],
+                breakdowns=[],
+            )
+            _, end, _, _, _ = plv.find_setup_slot(
+                candidate, duration, "VMC 1", single, operator_cal
+            )
+            if expected is None or end < expected[1]:
+                expected = (op, end)
+
+        _, end, op, _, _ = plv.find_setup_slot(
+            candidate, duration, "VMC 1", settings, operator_cal
+        )
+        assert (op, end) == expected
+
+
+def test_numpy_backend_matches_segment_calendar():
+    pytest.importorskip("numpy")
+    segments = _calendar_settings()
+    masks = _calendar_settings()
+    masks.calendar_backend = "numpy"
+    seg_cal = plv.calendar_for(segments).run_calendar("VMC 1")
+    mask_cal = plv.calendar_for(masks).run_calendar("VMC 1")
+
+    base = plv.to_minute(plv.parse_dt("2026-02-22 18:00"))
+    for offset in range(0, 3 * 24 * 60, 97):
+        start = base + offset
+        assert mask_cal.next_allowed(start) == seg_cal.next_allowed(start)
+        for minutes in (1, 45, 4000):
+            assert mask_cal.add_work(start, minutes) == seg_cal.add_work(start, minutes)
+        limit = start + 2000
+        assert list(mask_cal.iter_segments(start, limit)) == list(
+            seg_cal.iter_segments(start, limit)
+        )
+
+    arrivals = [base + 13 * i + (i % 7) * 40 for i in range(300)]
+    for cycle in (0, 1, 7, 55):
+        for prev in (None, arrivals):
+            expected = plv.place_pieces_stepwise(seg_cal, base + 5, prev, 300, cycle)
+            assert mask_cal.place_pieces(base + 5, prev, 300, cycle) == expected
+
+
+def test_numpy_backend_requires_numpy(monkeypatch):
+    settings = _calendar_settings()
+    settings.calendar_backend = "numpy"
+    monkeypatch.setattr(plv, "np", None)
+    with pytest.raises(RuntimeError, match="NumPy"):
+        plv.calendar_for(settings)
+
+
+def test_bulk_piece_placement_matches_stepwise():
+    import random
+
+    rng = random.Random(5)
+    settings = _calendar_settings()
+    cal = plv.calendar_for(settings).run_calendar("VMC 1")
+    base = plv.to_minute(plv.parse_dt("2026-02-22 12:00"))
+
+    for _ in range(40):
+        ready = base + rng.randrange(0, 3000)
+        qty = rng.randrange(1, 120)
+        cycle = rng.choice([0, 1, 3, 17, 95, 600])
+        arrivals = None
+        if rng.random() < 0.6:
+            cursor = base + rng.randrange(0, 3000)
+            arrivals = []
+            for _ in range(qty):
+                cursor += rng.randrange(0, 90)
+                arrivals.append(cursor)
+        expected = plv.place_pieces_stepwise(cal, ready, arrivals, qty, cycle)
+        assert cal.place_pieces(ready, arrivals, qty, cycle) == expected
+
+
+def test_columnar_piece_table_matches_row_dicts():
+    batches, settings = plv.load_input(None, "batch3", "machine")
+    results = plv.run_piece_level_schedule(batches, settings)
+    pieces = results["piece_rows"]
+    assert isinstance(pieces, plv.PieceTable)
+    assert len(pieces.machines) == len({r["Machine"] for r in pieces})
+
+    rows = list(pieces)
+    assert list(rows[0]) == list(plv.PIECE_FIELDS)
+    assert pieces[-1] == rows[-1]
+    assert pieces[1:3] == rows[1:3]
+    assert [plv.fmt_minute(m) for m in pieces.starts] == [r["RunStart"] for r in rows]
+
+    # The merged event view matches the sort-based row-dict builder exactly.
+    assert len(results["event_rows"]) == 2 * len(pieces)
+    assert list(results["event_rows"]) == plv.build_live_event_rows(rows)
+
+
+def test_operation_record_reads_as_summary_row():
+    minute = plv.to_minute(plv.parse_dt("2026-02-22 06:00"))
+    record = plv.OperationRecord(
+        part_number="PNX",
+        batch_id="B01",
+        operation_seq=2,
+        operation_name="Drill",
+        machine="VMC 1",
+        operator="A",
+        setup_start=minute,
+        setup_end=minute + 30,
+        run_start=minute + 30,
+        run_end=minute + 90,
+    )
+    assert list(record) == list(plv.OPERATION_FIELDS)
+    assert record["RunEnd"] == "2026-02-22 07:30"
+    assert record.get("Status") == "OK"
+    assert plv.row_minute(record, "SetupEnd") == minute + 30
+    assert plv.row_minute(dict(record), "SetupEnd") == minute + 30
+
+    earlier = {
+        "PartNumber": "PNX",
+        "Batch_ID": "B01",
+        "OperationSeq": 1,
+        "RunEnd": "2026-02-22 08:00",
+    }
+    report = plv.validate_results([earlier, record], {}, {}, None)
+    assert any("RunEnd ordering violation" in e for e in report["errors"])
+
+
+def test_sweep_validator_reports_non_adjacent_overlaps():
+    base = plv.to_minute(plv.parse_dt("2026-02-22 06:00"))
+    machine_cal = {
+        "VMC 1": [
+            plv.Interval(base, base + 100),
+            plv.Interval(base + 10, base + 20),
+            plv.Interval(base + 30, base + 40),
+            plv.Interval(base + 100, base + 110),
+        ]
+    }
+    report = plv.validate_results([], {}, machine_cal, None)
+    assert report["errors"] == [
+        "Machine overlap: VMC 1 at 2026-02-22 06:10",
+        "Machine overlap: VMC 1 at 2026-02-22 06:30",
+    ]
+
+    skipped = plv.validate_results([], {}, machine_cal, None, mode="off")
+    assert skipped["valid"] is None and skipped["skipped"] is True
+    assert skipped["errors"] == []
+    assert skipped["stats"]["validation_mode"] == "off"
+
+    raw = json.loads(
+        (REPO_ROOT / "scripts" / "piece_level_input.example.json").read_text()
+    )
+    raw["validate_mode"] = "bogus"
+    with pytest.raises(plv.InputValidationError, match="validate_mode"):
+        plv.parse_input(raw, "machine")
+
+
+def test_piece_precedence_check_modes():
+    def scheduled(seq, starts, ends, batch_index=0):
+        record = plv.OperationRecord(
+            part_number="PNX",
+            batch_id="B01",
+            operation_seq=seq,
+            operation_name=f"Op{seq}",
+            machine="VMC 1",
+            operator="A",
+            setup_start=0,
+            setup_end=0,
+            run_start=starts[0],
+            run_end=ends[-1],
+        )
+        return plv.ScheduledOperation(record, [], starts, ends, batch_index)
+
+    count = 1000
+    first = scheduled(1, list(range(count)), [i + 1 for i in range(count)])
+    bad = [i + 1 for i in range(count)]
+    bad[500] = 0
+    bad[-1] = 0
+    second = scheduled(2, bad, [i + 2 for i in range(count)])
+
+    full = plv.PiecePrecedenceCheck("full")
+    for op in (first, second):
+        full.add(op)
+    assert full.checked == count
+    assert full.errors == [
+        "Piece precedence violation for PNX B01 piece 501 op2",
+        f"Piece precedence violation for PNX B01 piece {count} op2",
+    ]
+
+    fast = plv.PiecePrecedenceCheck("fast")
+    for op in (first, second, scheduled(1, bad, bad, batch_index=1)):
+        fast.add(op)
+    assert fast.checked <= plv.FAST_PIECE_SAMPLES + 2
+    assert f"piece {count} op2" in fast.errors[-1]
+
+    off = plv.PiecePrecedenceCheck("off")
+    for op in (first, second):
+        off.add(op)
+    assert off.checked == 0 and off.errors == []
+
+
+def test_hot_path_counters_reset_per_run():
+    batches, settings = plv.demo_input("batch3", "machine")
+    first = plv.run_piece_level_schedule(batches, settings)
+    counters = first["validation"]["stats"]["counters"]
+    assert set(counters) == set(plv.COUNTER_FIELDS)
+    assert counters["operations"] == len(first["operation_rows"])
+    assert counters["machine_candidates"] == counters["setup_searches"]
+    assert counters["machine_candidates_max"] == 3
+    assert counters["pieces_placed_bulk"] == counters["machine_candidates"] * 3
+    assert counters["setup_operators_simulated"] <= counters["setup_operators_tried"]
+    assert counters["pieces_placed_stepwise"] == counters["add_work_calls"] == 0
+
+    # The calendar engine is reused, so nothing is compiled the second time.
+    second = plv.run_piece_level_schedule(batches, settings)
+    again = second["validation"]["stats"]["counters"]
+    assert again["calendar_days_compiled"] == 0
+    assert {k: v for k, v in again.items() if k != "calendar_days_compiled"} == {
+        k: v for k, v in counters.items() if k != "calendar_days_compiled"
+    }
+
+    # Zero cycle times fall back to stepwise placement, one add_work per piece.
+    plv.COUNTERS.reset()
+    run_cal = plv.CalendarEngine(settings).run_calendar("VMC 1")
+    run_cal.place_pieces(plv.to_minute(batches[0].start_datetime), None, 5, 0)
+    assert plv.COUNTERS.pieces_placed_stepwise == plv.COUNTERS.add_work_calls == 5
+
+
+def test_stream_mode_writes_identical_outputs(tmp_path: Path):
+    outputs = {}
+    for mode, extra in (("memory", []), ("stream", ["--stream"])):
+        out = tmp_path / mode
+        result = subprocess.run(
+            [
+                "python3",
+                "scripts/piece_level_verifier.py",
+                "--demo",
+                "batch3",
+                "--out-dir",
+                str(out),
+                "--no-cache",
+                *extra,
+            ],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        outputs[mode] = out
+
+    for name in plv.OUTPUT_FILES + ("validation_report.json",):
+        memory = (outputs["memory"] / name).read_bytes()
+        assert (outputs["stream"] / name).read_bytes() == memory, name
+    assert not list(outputs["stream"].glob("*.partial"))
+
+
+def test_result_cache_restores_outputs_and_evicts(tmp_path: Path):
+    cache_dir = tmp_path / "cache"
+
+    def run(out: Path, *extra: str) -> str:
+        result = subprocess.run(
+            [
+                "python3",
+                "scripts/piece_level_verifier.py",
+                "--demo",
+                "batch3",
+                "--out-dir",
+                str(out),
+                "--cache-dir",
+                str(cache_dir),
+                "--cache-max-entries",
+                "1",
+                *extra,
+            ],
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+        return result.stdout
+
+    assert "cache hit" not in run(tmp_path / "first")
+    assert "cache hit" in run(tmp_path / "second")
+    for name in plv.CACHED_FILES:
+        first = (tmp_path / "first" / name).read_bytes()
+        assert (tmp_path / "second" / name).read_bytes() == first, name
+
+    assert "cache hit" not in run(tmp_path / "ops", "--lane-mode", "operation")
+    assert len(list(cache_dir.iterdir())) == 1
+    assert "cache hit" not in run(tmp_path / "third")
+
+
+def test_result_cache_is_opt_in_and_keeps_result_shape(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(plv, "CACHE_DIR", tmp_path / "default_cache")
+    for name in ("first", "second"):
+        plv.main(["--demo", "batch3", "--out-dir", str(tmp_path / name)])
+    assert not (tmp_path / "default_cache").exists()
+
+    plv.main(["--demo", "batch3", "--out-dir", str(tmp_path / "opt"), "--cache"])
+    assert len(list((tmp_path / "default_cache").iterdir())) == 1
+
+    fresh = plv.main(["--demo", "batch3", "--out-dir", str(tmp_path / "a"), "--cache"])
+    hit = plv.main(["--demo", "batch3", "--out-dir", str(tmp_path / "b"), "--cache"])
+    streamed = plv.main(
+        ["--demo", "batch3", "--out-dir", str(tmp_path / "c"), "--stream"]
+    )
+    for results in (fresh, hit, streamed):
+        assert set(results) == {
+            "operation_rows",
+            "piece_rows",
+            "event_rows",
+            "validation",
+        }
+        assert len(results["operation_rows"]) == 4
+        assert len(list(results["piece_rows"])) == 12
+
+
+def test_batch_inputs_fan_out_with_summary(tmp_path: Path):
+    example = REPO_ROOT / "scripts" / "piece_level_input.example.json"
+    cells = tmp_path / "cells"
+    cells.mkdir()
+    (cells / "cell_a.json").write_bytes(example.read_bytes())
+    (cells / "cell_b.json").write_text('{"batches": 3}', encoding="utf-8")
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# nightly\ncells/cell_a.json\ncells/cell_b.json\n")
+    out = tmp_path / "out"
+
+    result = subprocess.run(
+        [
+            "python3",
+            "scripts/piece_level_verifier.py",
+            "--batch-inputs",
+            str(manifest),
+            "--jobs",
+            "2",
+            "--out-dir",
+            str(out),
+            "--no-cache",
+        ],
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 1, result.stderr
+    summary = json.loads((out / "batch_summary.json").read_text(encoding="utf-8"))
+    assert summary["jobs"] == 2 and summary["total"] == 2 and summary["failed"] == 1
+    ok, failed = summary["inputs"]
+    assert ok["status"] == "ok" and ok["out_dir"] == str(out / "cell_a")
+    assert ok["elapsed_sec"] >= 0
+    for name in plv.CACHED_FILES:
+        assert (out / "cell_a" / name).exists(), name
+    assert failed["status"] == "error" and "batches" in failed["error"]
+    assert (out / "cell_b" / "failure_diagnostic.json").exists()
+
+
+def test_main_argv_returns_results_for_in_process_callers(tmp_path: Path):
+    results = plv.main(
+        ["--demo", "batch3", "--out-dir", str(tmp_path / "demo"), "--no-cache"]
+    )
+    assert results["validation"]["valid"] in (True, False)
+    assert len(results["operation_rows"]) == 4
+    assert (tmp_path / "demo" / "operation_summary.csv").exists()
+
+    import chk121_250_runner as runner
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"batches": 3}', encoding="utf-8")
+    result = runner._run_verifier(["--input", str(bad), "--out-dir", str(tmp_path)])
+    assert result.returncode == 1
+    assert result.stderr.splitlines()[-1] == (
+        "InputValidationError: Invalid batches: expected array"
+    )
+    assert "failure diagnostic" in result.stdout
+
+
+def test_profile_records_phase_timings_and_bypasses_cache(tmp_path: Path):
+    import pstats
+
+    out_dir = tmp_path / "profiled"
+    cache_dir = tmp_path / "cache"
+    pstats_path = tmp_path / "run.pstats"
+    plv.main(
+        ["--demo", "batch3", "--out-dir", str(out_dir), "--cache-dir", str(cache_dir)]
+        + ["--profile", "--profile-pstats", str(pstats_path)]
+    )
+    report = json.loads((out_dir / "validation_report.json").read_text())
+    timings = report["timings"]
+    assert timings["tracemalloc"] is True
+    assert timings["pstats"] == str(pstats_path)
+    phases = timings["phases"]
+    for name in (
+        "load_input",
+        "schedule",
+        "setup_search",
+        "piece_timing",
+        "build_live_event_rows",
+        "validate_results",
+        "write:piece_flow.html",
+    ):
+        assert set(phases[name]) == {"calls", "wall_sec", "cpu_sec", "peak_bytes"}
+    assert phases["setup_search"]["calls"] >= report["stats"]["operation_rows"]
+    assert phases["schedule"]["peak_bytes"] >= phases["piece_timing"]["peak_bytes"]
+    assert not cache_dir.exists()
+    assert pstats.Stats(str(pstats_path)).total_calls > 0
+
+    plv.main(["--demo", "batch3", "--out-dir", str(out_dir), "--no-cache"])
+    report = json.loads((out_dir / "validation_report.json").read_text())
+    assert "timings" not in report
+
+
+def test_availability_ranges_report_each_rule_in_input_order():
+    from scripts import piece_conflict_suite as suite
+
+    row = {
+        "PartNumber": "PN1",
+        "Batch_ID": "B1",
+        "OperationSeq": 1,
+        "Machine": "VMC 1",
+        "SetupStart": "2026-03-02 09:00",
+        "RunEnd": "2026-03-02 13:00",
+    }
+    def window(start: str, end: str, machine: str = "VMC 1") -> dict:
+        return {
+            "machine": machine,
+            "type": "RANGE",
+            "start": f"2026-03-02 {start}",
+            "end": f"2026-03-02 {end}",
+        }
+
+    rules = [
+        window("10:00", "11:00"),
+        window("11:00", "12:00"),
+        {"machine": "VMC 1", "type": "PERMANENT"},
+        window("12:30", "09:30"),
+        window("13:00", "14:00"),
+        window("10:00", "11:00", machine="VMC 2"),
+    ]
+    conflicts = suite.check_machine_availability_conflict(
+        [row], {"machine_availability": rules}
+    )
+    prefix = "VMC 1 violates availability rule "
+    assert [c.message.replace(prefix, "") for c in conflicts] == [
+        "RANGE 2026-03-02 10:00 -> 2026-03-02 11:00",
+        "RANGE 2026-03-02 11:00 -> 2026-03-02 12:00",
+        "PERMANENT",
+        "RANGE 2026-03-02 12:30 -> 2026-03-02 09:30",
+    ]
+
+
+def test_conflict_suite_jobs_keep_manifest_order(tmp_path: Path):
+    from scripts import piece_conflict_suite as suite
+
+    source = REPO_ROOT / "scripts" / "testcases" / "piece_conflicts" / "manifest.json"
+    manifest = json.loads(source.read_text(encoding="utf-8"))
+    manifest["cases"] = list(reversed(manifest["cases"][:3]))
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+
+    serial = suite.run_suite(manifest_path, tmp_path / "serial", jobs=1)
+    pooled = suite.run_suite(manifest_path, tmp_path / "pooled", jobs=2)
+
+    expected_ids = [case["id"] for case in manifest["cases"]]
+    assert [r["id"] for r in pooled["reports"]] == expected_ids
+    assert pooled["jobs"] == 2
+    for left, right in zip(serial["reports"], pooled["reports"]):
+        assert set(right["timings"]) == {"schedule_sec", "conflict_check_sec"}
+        left.pop("timings")
+        right.pop("timings")
+        assert left == right
+
+
+def test_scheduler_server_round_trip(tmp_path: Path):
+    import http.client
+    import threading
+    import urllib.error
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+
+    from scripts import piece_level_server as pls
+
+    payload = (REPO_ROOT / "scripts" / "piece_level_input.example.json").read_bytes()
+
+    def http_status(port: int, content_length: str) -> int:
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        conn.putrequest("POST", "/schedule")
+        conn.putheader("Content-Type", "application/json")
+        conn.putheader("Content-Length", content_length)
+        conn.endheaders()
+        status = conn.getresponse().status
+        conn.close()
+        return status
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    server = pls.SchedulerServer(
+        ("127.0.0.1", 0), executor, 1, tmp_path / "cache", tmp_path
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def post(query: str, body: bytes = payload, **headers: str):
+        request = urllib.request.Request(
+            f"{base}/schedule{query}",
+            data=body,
+            headers={"Content-Type": "application/json", **headers},
+        )
+        with urllib.request.urlopen(request) as response:
+            return response.headers.get("X-Cache"), json.loads(response.read())
+
+    def post_error(query: str, body: bytes = payload, **headers: str):
+        with pytest.raises(urllib.error.HTTPError) as raised:
+            post(query, body, **headers)
+        return raised.value.code, json.loads(raised.value.read())["error"]
+
+    try:
+        with urllib.request.urlopen(f"{base}/health") as response:
+            assert json.loads(response.read())["status"] == "ok"
+
+        out = tmp_path / "out"
+        state, first = post("?rows=pieces&out_dir=out")
+        assert state == "miss"
+        with (out / "operation_summary.csv").open(newline="", encoding="utf-8") as f:
+            expected = [
+                {key: str(value) for key, value in row.items()}
+                for row in first["operation_rows"]
+            ]
+            assert list(csv.DictReader(f)) == expected
+        with (out / "piece_timeline.csv").open(newline="", encoding="utf-8") as f:
+            assert len(list(csv.DictReader(f))) == len(first["piece_rows"])
+
+        state, again = post("?rows=pieces")
+        assert state == "hit" and again == first
+
+        code, error = post_error("", b'{"batches": 3}')
+        assert code == 400 and "batches" in error
+        raw = json.loads(payload)
+        for field, value in (
+            ("calendar_backend", "bogus"),
+            ("shifts", ["A"]),
+            ("setup_window", 5),
+        ):
+            assert post_error("", json.dumps({**raw, field: value}).encode())[0] == 400
+        for out_dir in ("../escape", str(tmp_path.parent / "abs")):
+            code, error = post_error(f"?out_dir={out_dir}")
+            assert code == 400 and "out root" in error
+        assert not (tmp_path.parent / "escape").exists()
+        assert post_error("", **{"Content-Type": "text/plain"})[0] == 415
+        status = http_status(server.server_address[1], "abc")
+        assert status == 400
+    finally:
+        server.shutdown()
+        server.server_close()
+        executor.shutdown()
+
+
+def test_prd500_executor_respects_depends_on_and_exclusive(tmp_path: Path):
+    import prd500_runner as prd
+
+    stamp = tmp_path / "order.txt"
+
+    def suite(suite_id: str, code: str = "", **extra):
+        script = (
+            f"import time; time.sleep(0.2); print({suite_id!r});"
+            f"open({str(stamp)!r}, 'a').write({suite_id!r} + '\\n');{code}"
+        )
+        return {
+            "id": suite_id,
+            "check_ids": [1],
+            "command": [sys.executable, "-c", script],
+            **extra,
+        }
+
+    suites = [
+        suite("build"),
+        suite("lint", "raise SystemExit(2)"),
+        suite("report", depends_on=["build", "not-in-profile"]),
+        suite("perf", exclusive=True),
+        suite("tail"),
+    ]
+    results = prd.execute_suites(suites, tmp_path, jobs=3)
+
+    assert [r["suite"] for r in results] == [s["id"] for s in suites]
+    assert [r["status"] for r in results] == ["PASS", "FAIL", "PASS", "PASS", "PASS"]
+    order = stamp.read_text().split()
+    assert order.index("report") > order.index("build")
+    before_perf = ("build", "lint", "report")
+    assert order.index("perf") > max(order.index(name) for name in before_perf)
+    assert order.index("tail") > order.index("perf")
+    log = (tmp_path / "build.log").read_text(encoding="utf-8")
+    assert log.startswith("$ ") and "--- stdout ---\nbuild\n" in log
+    assert not list(tmp_path.glob("*.stderr.log"))
+
+
+def test_prd500_suite_cache_tracks_input_fingerprints(tmp_path: Path, monkeypatch):
+    import prd500_runner as prd
+
+    monkeypatch.setattr(prd, "ROOT", tmp_path)
+    (tmp_path / "src").mkdir()
+    source = tmp_path / "src" / "plan.txt"
+    source.write_text("v1", encoding="utf-8")
+    runs = tmp_path / "runs.txt"
+    suites = [
+        {
+            "id": "unit",
+            "check_ids": [1, 2],
+            "command": [
+                sys.executable,
+                "-c",
+                f"open({str(runs)!r}, 'a').write('x')",
+            ],
+            "inputs": ["src/*.txt"],
+        },
+        {
+            "id": "flaky",
+            "check_ids": [3],
+            "command": [
+                sys.executable,
+                "-c",
+                f"open({str(runs)!r}, 'a').write('f'); raise SystemExit(1)",
+            ],
+        },
+    ]
+
+    def run(force: bool = False) -> dict:
+        manifest = prd.build_manifest()
+        prd.run_profile(manifest, tmp_path / "out", suites, "unit", force=force)
+        assert manifest[0]["status"] == "PASS" and manifest[2]["status"] == "FAIL"
+        results = (tmp_path / "out" / "unit_suite_results.json").read_text()
+        unit, flaky = json.loads(results)
+        assert flaky["cached"] is False
+        return unit
+
+    assert run()["cached"] is False
+    cached = run()
+    assert cached["cached"] is True and Path(cached["log"]).is_file()
+    source.write_text("v2", encoding="utf-8")
+    assert run()["cached"] is False
+    assert run(force=True)["cached"] is False
+    assert runs.read_text().count("x") == 3 and runs.read_text().count("f") == 4
+    cache_path = tmp_path / "out" / "unit_suite_cache.json"
+    cache = json.loads(cache_path.read_text())
+    assert list(cache) == ["unit"]
+
+    # A malformed entry is a cache miss, not a crash.
+    fingerprint = cache["unit"]["fingerprint"]
+    for result in ({}, {"result": 1}, {"result": {"status": "PASS"}}):
+        entry = {"fingerprint": fingerprint, **result}
+        cache_path.write_text(json.dumps({"unit": entry}), encoding="utf-8")
+        assert run()["cached"] is False
+    assert runs.read_text().count("x") == 6
+
+    (tmp_path / "scripts").mkdir()
+    script = tmp_path / "scripts" / "check.py"
+    script.write_text("", encoding="utf-8")
+    assert prd.suite_input_files({"command": ["python3", "-m", "pytest"]}) == [script]
+
+
+def test_bench_cases_are_deterministic_and_judged_against_baseline():
+    from scripts import piece_level_bench as bench
+
+    cases = bench.build_cases("full", "both")
+    assert [case.check_id for case in cases] == list(range(451, 481))
+    quick = bench.build_cases("quick", "both")
+    assert max(case.batch_qty for case in quick) == 10000
+    assert len({case.name for case in quick}) == len(quick)
+    assert [case.check_id for case in quick if case.capped] == [455, 470]
+
+    case = bench.BenchCase(451, 10, 2, 2, calendar=True)
+    entry = bench.measure_case(case, repeats=2, warmup=0)
+    assert entry["deterministic"] and entry["valid"]
+    assert entry["pieces"] == 30
+
+    baseline = {case.name: {"median_ms": 1.0, "digest": entry["digest"]}}
+    entry["median_ms"] = 100.0
+    bench.judge(entry, baseline, regression_pct=25, min_delta_ms=5)
+    assert entry["status"] == "FAIL" and "regressed" in entry["notes"]
+    entry["median_ms"] = 1.1
+    bench.judge(entry, baseline, regression_pct=25, min_delta_ms=5)
+    assert entry["status"] == "PASS" and entry["notes"] == ""
+    assert entry["regression_checked"] is True
+    bench.judge(entry, {}, regression_pct=25, min_delta_ms=5)
+    assert entry["status"] == "PASS" and entry["regression_checked"] is False
+    entry["valid"] = False
+    bench.judge(entry, baseline, regression_pct=25, min_delta_ms=5)
+    assert entry["status"] == "FAIL" and "validation" in entry["notes"]
+    assert bench.percentile([5, 1, 4, 2, 3], 95) == 5